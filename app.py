@@ -1,15 +1,59 @@
 import streamlit as st
 from pose_extractor import process_video, add_jiggle_physics
-from bvh_converter import convert_to_bvh
+from bvh_converter import write_bvh
+from exporters import EXPORT_FORMATS, export_bytes
+from jobs import JobQueue, QueueFullError
+from live_stream import CameraSource, LiveStream, SyntheticSource
+from result_cache import ResultCache
+from smoothing import smooth_dataframe
+from trajectory import DEFAULT_CONTROL_RATE
 from datetime import datetime
+import io
 import os
 import time
 
 # ======== CONSTANTS ========
 GAME_JOINTS = ["LEFT_SHOULDER", "RIGHT_SHOULDER",
                "LEFT_ELBOW", "RIGHT_ELBOW",
+               "LEFT_WRIST", "RIGHT_WRIST",
                "LEFT_HIP", "RIGHT_HIP",
-               "LEFT_KNEE", "RIGHT_KNEE"]
+               "LEFT_KNEE", "RIGHT_KNEE",
+               "NOSE", "LEFT_EAR", "RIGHT_EAR"]
+
+# A live stream whose page stops polling (closed or abandoned tab) stops
+# itself after this many seconds
+LIVE_IDLE_TIMEOUT = 30.0
+
+# Smoothing label -> smoothing.SMOOTHING_METHODS key
+SMOOTHING_CHOICES = {
+    "Off": None,
+    "One-Euro (adaptive)": "one_euro",
+    "Savitzky-Golay": "savitzky_golay",
+    "Exponential": "exponential",
+}
+
+# Tracking choice -> process_video mode
+ANALYSIS_MODES = {
+    "🧍 Human Movement": "human",
+    "🚗 Object Physics": "object",
+    "🚦 Multiple Objects": "multi_object",
+}
+
+# Robotics download formats: label -> exporters.EXPORT_FORMATS key
+ROBOT_FORMATS = {
+    "CSV": "csv",
+    "CSV (gzip)": "csv.gz",
+    "NPZ (NumPy)": "npz",
+    "Parquet": "parquet",
+    "Feather": "feather",
+    "Raw float32": "raw",
+    "Joint angles (CSV)": "angles.csv",
+    "Arduino sketch": "arduino",
+    "ROS JointTrajectory (JSON)": "ros.json",
+    "ROS JointTrajectory (YAML)": "ros.yaml",
+}
+CSV_FORMATS = {"csv", "csv.gz", "angles.csv"}
+ROS_FORMATS = {"ros.json", "ros.yaml"}
 
 # ======== 1. Modern Page Config ========
 st.set_page_config(
@@ -24,6 +68,74 @@ st.set_page_config(
     }
 )
 
+
+@st.cache_resource
+def get_result_cache():
+    """Processed-video cache shared by every session on this host"""
+    return ResultCache()
+
+
+@st.cache_resource
+def get_job_queue():
+    """Background conversion workers shared by every session"""
+    return JobQueue()
+
+
+def convert_upload(video_bytes, mode, joints_to_track, jiggle, cache, progress, **options):
+    """Job body: runs process_video on an uploaded clip, decoded from memory"""
+    joint_data = process_video(video_bytes, mode=mode, joints_to_track=joints_to_track,
+                               cache=cache, progress=progress, **options)
+    if jiggle:
+        joint_data = add_jiggle_physics(joint_data)
+    return joint_data
+
+
+def render_job_progress(job):
+    """Progress bar and ETA for a queued or running job"""
+    stage_labels = {"enhance": "Enhancing video", "extract": "Extracting movement"}
+    done, total, stage = job.progress
+    if job.status == "queued":
+        st.progress(0)
+        st.caption("Waiting for a free worker…")
+    elif total:
+        st.progress(min(done / total, 1.0))
+        elapsed = time.time() - (job.started or time.time())
+        eta = elapsed * (total - done) / done if done else 0
+        st.caption(f"{stage_labels.get(stage, stage)}: frame {done}/{total} · ~{eta:.0f}s left")
+    else:
+        st.progress(0)
+        st.caption(f"{stage_labels.get(stage, stage)}: frame {done}")
+
+
+def make_live_source():
+    """Camera from MOTION2CODE_LIVE_SOURCE (device index or URL, default 0)
+
+    The camera is opened on the machine running the app, not in the
+    visitor's browser. "synthetic" swaps in a generated stick figure for
+    testing without a camera.
+    """
+    name = os.environ.get("MOTION2CODE_LIVE_SOURCE", "0")
+    if name == "synthetic":
+        return SyntheticSource()
+    return CameraSource(int(name) if name.isdigit() else name)
+
+
+def render_live_stream(stream, joints_to_track):
+    """Counters and the most recent landmarks of a running live stream"""
+    stats = stream.stats()
+    cols = st.columns(4)
+    cols[0].metric("Frames captured", stats['captured'])
+    cols[1].metric("Poses extracted", stats['detected'])
+    cols[2].metric("Frames dropped", stats['dropped'])
+    latency = stats['latency_p95']
+    cols[3].metric("Latency (p95)", f"{latency * 1000:.0f} ms" if latency is not None else "–")
+    recent = stream.to_dataframe(joints_to_track, last=90)
+    if len(recent):
+        st.line_chart(recent.filter(like="_Y"))
+    else:
+        st.caption("Waiting for a pose…")
+
+
 # Visitor counter
 if 'visitors' not in st.session_state:
     st.session_state.visitors = 0
@@ -481,145 +593,233 @@ user_type = st.radio("What do you want to create?",
                      ("🤖 Robotics Code (CSV)", "🎮 Game Animation (BVH)"),
                      horizontal=True)
 
+robot_format, csv_precision, csv_timing, control_rate = "CSV", 6, True, DEFAULT_CONTROL_RATE
+if user_type == "🤖 Robotics Code (CSV)":
+    robot_format = st.radio("Robot data format", list(ROBOT_FORMATS), horizontal=True,
+                            help="Binary formats are smaller and much faster to load in ROS nodes")
+    if ROBOT_FORMATS[robot_format] in CSV_FORMATS:
+        csv_col1, csv_col2 = st.columns(2)
+        with csv_col1:
+            csv_precision = st.slider("CSV decimal places", 2, 8, 6)
+        with csv_col2:
+            csv_timing = st.checkbox("Include frame index and timestamp columns", value=True)
+    elif ROBOT_FORMATS[robot_format] in ROS_FORMATS:
+        control_rate = st.select_slider("Control rate (Hz)", [10, 25, 50, 100, 200, 500, 1000],
+                                        value=int(DEFAULT_CONTROL_RATE),
+                                        help="Joint angles are resampled to this fixed rate "
+                                             "using the video's own frame timestamps")
+
+smoothing_method = SMOOTHING_CHOICES[st.selectbox(
+    "Jitter smoothing", list(SMOOTHING_CHOICES), index=1,
+    help="Removes MediaPipe jitter before export; One-Euro keeps fast moves sharp")]
+
 # New tracking mode selection
 analysis_mode = st.radio(
     "What do you want to track?",
-    ("🧍 Human Movement", "🚗 Object Physics"),
+    tuple(ANALYSIS_MODES),
     horizontal=True
 )
 
+# Object mode picks the moving object itself; the tier trades speed for accuracy
+tracker_tier = "balanced"
+if analysis_mode == "🚗 Object Physics":
+    tracker_tier = st.radio("Tracking speed", ("fast", "balanced", "accurate"), index=1,
+                            horizontal=True, format_func=str.capitalize,
+                            help="Fast follows feature points (KLT), balanced uses the KCF tracker, "
+                                 "accurate the slower but steadier CSRT tracker")
+
 # Input method selection
 input_method = st.radio("How to provide movement data?",
-                        ("📁 Upload a video", "🎥 Use webcam"),
+                        ("📁 Upload a video", "🎥 Use webcam", "📡 Live stream"),
                         horizontal=True)
+game_mode = user_type == "🎮 Game Animation (BVH)"
+
+video_bytes = None
 
-video_path = None
+# Leaving live mode releases the camera and its Pose tracker
+if input_method != "📡 Live stream" and st.session_state.get("live_stream") is not None:
+    st.session_state.live_stream.stop()
+    st.session_state.live_stream = None
 
 if input_method == "📁 Upload a video":
     uploaded_file = st.file_uploader("Drag & drop your video (MP4, MOV, AVI)", type=["mp4", "mov", "avi"])
     if uploaded_file:
         with st.expander("🎬 Video Preview", expanded=True):
             st.video(uploaded_file)
-        video_path = "temp_video.mp4"
-        with open(video_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        video_bytes = uploaded_file.getvalue()
+elif input_method == "📡 Live stream":
+    if ANALYSIS_MODES[analysis_mode] != "human":
+        st.info("Live mode tracks human movement; object tracking needs an uploaded video.")
+    live = st.session_state.get("live_stream")
+    live_joints = GAME_JOINTS if game_mode else None
+    if live is not None and live.running:
+        live.heartbeat()
+        if st.button("⏹️ Stop and convert", type="primary"):
+            live.stop()
+            live_result = live.to_dataframe(live_joints)
+            if live_result.empty:
+                live.error = "no pose was detected, keep your whole body in frame"
+            else:
+                if game_mode:
+                    live_result = add_jiggle_physics(live_result)
+                st.session_state.live_result = live_result
+                st.session_state.job_output = user_type
+                st.session_state.live_stream = None
+            st.rerun()
+        render_live_stream(live, live_joints)
+        time.sleep(0.25)
+        st.rerun()
+    else:
+        if live is not None and live.error:
+            st.error(f"❌ Live capture stopped: {live.error}")
+        st.write("Position yourself in frame; landmarks appear as you move")
+        st.caption("Live mode reads the camera attached to the server running this app, "
+                   "not your browser's webcam. To record from your own camera, use "
+                   "\"🎥 Use webcam\".")
+        if st.button("▶️ Start live capture", type="primary"):
+            st.session_state.live_stream = LiveStream(make_live_source(),
+                                                      idle_timeout=LIVE_IDLE_TIMEOUT).start()
+            st.session_state.job_id = None
+            st.session_state.live_result = None
+            st.rerun()
 else:
     st.write("Position yourself in frame and click the button below")
     cam_feed = st.camera_input("Take a movement video (5-10 seconds recommended)")
     if cam_feed:
-        video_path = "temp_video.mp4"
-        with open(video_path, "wb") as f:
-            f.write(cam_feed.getbuffer())
+        video_bytes = cam_feed.getvalue()
         st.success("🎥 Video captured! Click 'Process Movement' below")
 
-# Process video if available
-if video_path and st.button("🚀 Process Movement", type="primary"):
+# Submit the video to the background job queue
+if video_bytes and st.button("🚀 Process Movement", type="primary"):
+    try:
+        st.session_state.job_id = get_job_queue().submit(
+            convert_upload,
+            video_bytes,
+            mode=ANALYSIS_MODES[analysis_mode],
+            joints_to_track=GAME_JOINTS if game_mode else None,
+            jiggle=game_mode,
+            cache=get_result_cache(),
+            tracker_tier=tracker_tier
+        )
+        st.session_state.job_output = user_type
+        st.session_state.live_result = None
+    except QueueFullError as e:
+        st.warning(f"⏳ Server is busy: {e}")
+
+# Poll the current job; results survive reruns and widget interaction
+job = get_job_queue().get(st.session_state.get("job_id") or "")
+joint_data = st.session_state.get("live_result")
+if job is not None and job.active:
     with st.spinner('🔍 Analyzing movements with pose estimation...'):
-        progress_bar = st.progress(0)
-
-        try:
-            for i in range(100):
-                time.sleep(0.02)  # Simulate processing
-                progress_bar.progress(i + 1)
-
-            if user_type == "🤖 Robotics Code (CSV)":
-                joint_data = process_video(
-                    video_path,
-                    mode="object" if analysis_mode == "🚗 Object Physics" else "human",
-                    joints_to_track=None
-                )
-                st.success('✅ Movement analysis complete!')
-
-                # Show data preview
-                with st.expander("📊 Joint Data Preview", expanded=True):
-                    st.write("First 3 frames of joint coordinates (X,Y,Z):")
-                    st.dataframe(joint_data.head(3))
-
-                    st.markdown("""
-                    <style>
-                        .stDataFrame {
-                            background-color: rgba(30, 30, 30, 0.7);
-                            color: white;
-                        }
-                        .stDataFrame td {
-                            border: 1px solid rgba(255, 255, 255, 0.1);
-                        }
-                    </style>
-                    """, unsafe_allow_html=True)
-
-                    # Download button
-                    csv = joint_data.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        label="📥 Download Robot Joint Data (CSV)",
-                        data=csv,
-                        file_name="robot_movements.csv",
-                        mime="text/csv",
-                        help="Contains timestamped joint coordinates for robotic programming"
-                    )
+        render_job_progress(job)
+        time.sleep(0.5)
+    st.rerun()
+
+elif job is not None and job.status == "failed":
+    st.error(f"❌ Error processing video: {job.error}")
+    st.markdown("""
+    <div style='background: rgba(255, 77, 77, 0.1); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 3px solid #ff4d4d;'>
+        <p style='margin-bottom: 0;'>Try these fixes:</p>
+        <ul style='margin-bottom: 0;'>
+            <li>Ensure good lighting and clear visibility of your body</li>
+            <li>Use videos shorter than 30 seconds</li>
+            <li>Make movements distinct and deliberate</li>
+        </ul>
+    </div>
+    """, unsafe_allow_html=True)
+
+elif job is not None and job.status == "done":
+    joint_data = job.result
+
+if joint_data is not None:
+    try:
+        joint_data = smooth_dataframe(joint_data, smoothing_method)
+        if st.session_state.job_output == "🤖 Robotics Code (CSV)":
+            st.success('✅ Movement analysis complete!')
+
+            # Show data preview
+            with st.expander("📊 Joint Data Preview", expanded=True):
+                st.write("First 3 frames of joint coordinates (X,Y,Z):")
+                st.dataframe(joint_data.head(3))
 
-                    # Robot simulation
-                    st.markdown("---")
-                    st.subheader("🤖 Robot Arm Visualization")
-                    if st.checkbox("Show joint movement simulation", value=True):
-                        st.write("First frame joint positions (normalized coordinates):")
-                    cols = st.columns(3)
-                    for i, (x, y, z) in enumerate(zip(joint_data.iloc[0][::3],
-                                                      joint_data.iloc[0][1::3],
-                                                      joint_data.iloc[0][2::3])):
-                        with cols[i % 3]:
-                            st.metric(
-                                label=f"Joint {i + 1}",
-                                value=f"X:{x:.2f} Y:{y:.2f}",
-                                delta=f"Z:{z:.2f}"
-                            )
-
-            else:  # Game Dev Mode
-                joint_data = process_video(
-                    video_path,
-                    mode="object" if analysis_mode == "🚗 Object Physics" else "human",
-                    joints_to_track=GAME_JOINTS
-                )
-                joint_data = add_jiggle_physics(joint_data)
-                bvh_data = convert_to_bvh(joint_data)
-
-                st.success('✅ Animation conversion complete!')
-
-                # BVH preview
-                with st.expander("📜 BVH File Preview", expanded=False):
-                    st.code(bvh_data[:500] + "\n...", language="text")
-
-                st.download_button(
-                    label="📥 Download Character Animation (BVH)",
-                    data=bvh_data,
-                    file_name="character_animation.bvh",
-                    mime="text/plain",
-                    help="BVH file compatible with Blender, Maya, Unity, and Unreal Engine"
-                )
-
-                # Animation info
                 st.markdown("""
-                <div style='background: rgba(0, 180, 216, 0.1); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 3px solid #00b4d8;'>
-                    <p style='margin-bottom: 0.5rem; font-weight: 600;'>🕹️ Game Engine Compatibility</p>
-                    <p style='margin-bottom: 0; font-size: 0.9rem;'>This BVH file works with most game engines including Unity, Unreal Engine, Godot, and 3D software like Blender and Maya.</p>
-                </div>
+                <style>
+                    .stDataFrame {
+                        background-color: rgba(30, 30, 30, 0.7);
+                        color: white;
+                    }
+                    .stDataFrame td {
+                        border: 1px solid rgba(255, 255, 255, 0.1);
+                    }
+                </style>
                 """, unsafe_allow_html=True)
 
-        except Exception as e:
-            st.error(f"❌ Error processing video: {str(e)}")
+                # Download button
+                export_format = ROBOT_FORMATS[robot_format]
+                _, extension, mime = EXPORT_FORMATS[export_format]
+                export_options = {}
+                if export_format in CSV_FORMATS:
+                    export_options = dict(precision=csv_precision,
+                                          include_frame=csv_timing,
+                                          include_timestamp=csv_timing)
+                elif export_format in ROS_FORMATS:
+                    export_options = dict(rate=float(control_rate))
+                try:
+                    st.download_button(
+                        label=f"📥 Download Robot Joint Data ({robot_format})",
+                        data=export_bytes(joint_data, export_format, **export_options),
+                        file_name=f"robot_movements.{extension}",
+                        mime=mime,
+                        help="Contains timestamped joint coordinates for robotic programming"
+                    )
+                except (ImportError, ValueError) as e:
+                    st.warning(str(e))
+
+                # Robot simulation
+                st.markdown("---")
+                st.subheader("🤖 Robot Arm Visualization")
+                if st.checkbox("Show joint movement simulation", value=True):
+                    st.write("First frame joint positions (normalized coordinates):")
+                cols = st.columns(3)
+                for i, (x, y, z) in enumerate(zip(joint_data.iloc[0][::3],
+                                                  joint_data.iloc[0][1::3],
+                                                  joint_data.iloc[0][2::3])):
+                    with cols[i % 3]:
+                        st.metric(
+                            label=f"Joint {i + 1}",
+                            value=f"X:{x:.2f} Y:{y:.2f}",
+                            delta=f"Z:{z:.2f}"
+                        )
+
+        else:  # Game Dev Mode
+            bvh_file = io.BytesIO()
+            write_bvh(joint_data, bvh_file)
+            bvh_preview = bvh_file.getvalue()[:500].decode("utf-8", errors="ignore")
+
+            st.success('✅ Animation conversion complete!')
+
+            # BVH preview
+            with st.expander("📜 BVH File Preview", expanded=False):
+                st.code(bvh_preview + "\n...", language="text")
+
+            st.download_button(
+                label="📥 Download Character Animation (BVH)",
+                data=bvh_file.getvalue(),
+                file_name="character_animation.bvh",
+                mime="text/plain",
+                help="BVH file compatible with Blender, Maya, Unity, and Unreal Engine"
+            )
+
+            # Animation info
             st.markdown("""
-            <div style='background: rgba(255, 77, 77, 0.1); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 3px solid #ff4d4d;'>
-                <p style='margin-bottom: 0;'>Try these fixes:</p>
-                <ul style='margin-bottom: 0;'>
-                    <li>Ensure good lighting and clear visibility of your body</li>
-                    <li>Use videos shorter than 30 seconds</li>
-                    <li>Make movements distinct and deliberate</li>
-                </ul>
+            <div style='background: rgba(0, 180, 216, 0.1); padding: 1rem; border-radius: 8px; margin-top: 1rem; border-left: 3px solid #00b4d8;'>
+                <p style='margin-bottom: 0.5rem; font-weight: 600;'>🕹️ Game Engine Compatibility</p>
+                <p style='margin-bottom: 0; font-size: 0.9rem;'>This BVH file works with most game engines including Unity, Unreal Engine, Godot, and 3D software like Blender and Maya.</p>
             </div>
             """, unsafe_allow_html=True)
 
-    # Clean up
-    if os.path.exists(video_path):
-        os.remove(video_path)
+    except Exception as e:
+        st.error(f"❌ Error exporting results: {str(e)}")
 
 # ======== 5. Tutorial Section ========
 st.markdown("---")
@@ -677,7 +877,7 @@ with tab2:
         <div style='flex: 1;'>
             <h4 style='color: #00b4d8; margin-bottom: 1rem;'>📈 ROS Integration</h4>
             <ol style='padding-left: 1.5rem;'>
-                <li>Import CSV as trajectory points</li>
+                <li>Download a ROS JointTrajectory (fixed-rate, timestamped)</li>
                 <li>Use MoveIt! for motion planning</li>
                 <li>Adjust for your robot's kinematics</li>
                 <li>Test in simulation first</li>
@@ -0,0 +1,356 @@
+"""Throughput benchmarks for the processing pipeline
+
+Generates deterministic synthetic videos, then measures frames/s and peak
+traced memory for each stage. Results are written as JSON so runs from
+different commits can be compared:
+
+    python benchmark.py                       # writes benchmark_results/<commit>.json
+    python benchmark.py --sizes 720p --lengths 120
+    python benchmark.py --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime
+from functools import partial
+
+import cv2
+import numpy as np
+
+from bvh_converter import convert_to_bvh, write_bvh
+from exporters import export_csv
+from live_stream import LiveStream, SyntheticSource, draw_stick_figure
+from object_tracker import (TRACKER_TIERS, MotionDetector, MultiObjectTracker, ObjectTracker,
+                            create_tracker, detect_moving_object)
+from pose_extractor import (FrameEnhancer, LandmarkBuffer, NUM_LANDMARKS,
+                            enhance_video_quality)
+from pose_pool import PosePool
+
+RESOLUTIONS = {
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+DEFAULT_LENGTHS = (60, 300)
+SYNTHETIC_FPS = 30
+SEED = 1234
+
+GAME_JOINTS = ["LEFT_SHOULDER", "RIGHT_SHOULDER",
+               "LEFT_ELBOW", "RIGHT_ELBOW",
+               "LEFT_WRIST", "RIGHT_WRIST",
+               "LEFT_HIP", "RIGHT_HIP",
+               "LEFT_KNEE", "RIGHT_KNEE",
+               "NOSE", "LEFT_EAR", "RIGHT_EAR"]
+
+# Stand-in for a MediaPipe landmark message
+Landmark = namedtuple("Landmark", "x y z visibility")
+
+
+def make_synthetic_video(path, width, height, frames, fps=SYNTHETIC_FPS):
+    """Writes a deterministic clip of a moving stick figure over textured noise"""
+    rng = np.random.default_rng(SEED)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 5)
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    for i in range(frames):
+        out.write(draw_stick_figure(background.copy(), i, fps))
+    out.release()
+    return path
+
+
+def synthetic_landmarks(frames):
+    """Deterministic landmark messages, one list of 33 per frame"""
+    rng = np.random.default_rng(SEED)
+    values = rng.random((frames, NUM_LANDMARKS, 4), dtype=np.float32)
+    return [[Landmark(*lm) for lm in frame] for frame in values]
+
+
+def _iter_frames(video_path):
+    cap = cv2.VideoCapture(video_path)
+    try:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+# Each stage takes the clip context and returns (frames processed, seconds
+# spent in the stage itself). Stages that need decoded input time only
+# their own work so decode cost isn't counted twice.
+
+def stage_decode(ctx):
+    start = time.perf_counter()
+    count = sum(1 for _ in _iter_frames(ctx["video"]))
+    return count, time.perf_counter() - start
+
+
+def stage_enhance_video_quality(ctx):
+    start = time.perf_counter()
+    enhance_video_quality(ctx["video"], os.path.join(ctx["workdir"], "enhanced.mp4"))
+    return ctx["frames"], time.perf_counter() - start
+
+
+def stage_enhance_stream(ctx):
+    enhancer = FrameEnhancer()
+    spent = 0.0
+    count = 0
+    for frame in _iter_frames(ctx["video"]):
+        start = time.perf_counter()
+        enhancer(frame, rgb=True)
+        spent += time.perf_counter() - start
+        count += 1
+    return count, spent
+
+
+def stage_pose_inference(ctx):
+    pool = PosePool(size=1)
+    spent = 0.0
+    count = 0
+    with pool.checkout() as pose:
+        for frame in _iter_frames(ctx["video"]):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            start = time.perf_counter()
+            pose.process(rgb)
+            spent += time.perf_counter() - start
+            count += 1
+    pool.close()
+    return count, spent
+
+
+def stage_dataframe_build(ctx):
+    landmarks = ctx["landmarks"]
+    start = time.perf_counter()
+    buffer = LandmarkBuffer()
+    for index, frame in enumerate(landmarks):
+        buffer.append(index, frame)
+    ctx["joint_data"] = buffer.to_dataframe(GAME_JOINTS)
+    ctx["all_joints"] = buffer.to_dataframe()
+    return len(landmarks), time.perf_counter() - start
+
+
+def stage_convert_to_bvh(ctx):
+    data = ctx["joint_data"]
+    start = time.perf_counter()
+    convert_to_bvh(data)
+    return len(data), time.perf_counter() - start
+
+
+def stage_write_bvh(ctx):
+    data = ctx["joint_data"]
+    start = time.perf_counter()
+    with open(os.devnull, "w") as sink:
+        write_bvh(data, sink)
+    return len(data), time.perf_counter() - start
+
+
+def stage_csv_export(ctx):
+    data = ctx["all_joints"]
+    start = time.perf_counter()
+    data.to_csv(index=False).encode('utf-8')
+    return len(data), time.perf_counter() - start
+
+
+def stage_csv_stream(ctx):
+    data = ctx["all_joints"]
+    start = time.perf_counter()
+    with open(os.devnull, "wb") as sink:
+        export_csv(data, sink, compress=True)
+    return len(data), time.perf_counter() - start
+
+
+def stage_object_tracker(ctx, detect_every_frame=False):
+    tracker = ObjectTracker(detect_every_frame=detect_every_frame)
+    for frame in _iter_frames(ctx["video"]):
+        tracker.track(frame)
+    stats = tracker.stats()
+    return stats["frames"], stats["frames"] / stats["fps"] if stats["fps"] else 0.0
+
+
+def stage_object_tracker_redetect(ctx):
+    # Baseline for the KLT tracker: fresh feature detection on every frame
+    return stage_object_tracker(ctx, detect_every_frame=True)
+
+
+def stage_tracker_tier(ctx, tier):
+    # Box trackers behind process_video's object mode; init is not timed
+    frames = enumerate(_iter_frames(ctx["video"]))
+    found = detect_moving_object(frames)
+    if found is None:
+        raise RuntimeError("no moving object found to initialise the tracker")
+    _, frame, bbox = found
+    tracker = create_tracker(tier)
+    tracker.init(frame, bbox)
+    spent = 0.0
+    count = 0
+    for _, frame in frames:
+        start = time.perf_counter()
+        tracker.update(frame)
+        spent += time.perf_counter() - start
+        count += 1
+    return count, spent
+
+
+def stage_multi_object(ctx):
+    detector = MotionDetector()
+    tracker = MultiObjectTracker()
+    spent = 0.0
+    count = 0
+    for frame in _iter_frames(ctx["video"]):
+        start = time.perf_counter()
+        tracker.update(detector.detect(frame))
+        spent += time.perf_counter() - start
+        count += 1
+    return count, spent
+
+
+def stage_live_stream(ctx):
+    # Unpaced source at the clip's size: measures how many frames the live
+    # path keeps up with, the rest are dropped by design
+    width, height = ctx["size"]
+    pool = PosePool(size=1)
+    stream = LiveStream(SyntheticSource(width, height, length=ctx["frames"], realtime=False),
+                        pose_pool=pool)
+    start = time.perf_counter()
+    with stream:
+        stream.wait()
+    spent = time.perf_counter() - start
+    pool.close()
+    return stream.processed, spent
+
+
+STAGES = {
+    "decode": stage_decode,
+    "enhance_video_quality": stage_enhance_video_quality,
+    "enhance_stream": stage_enhance_stream,
+    "pose_inference": stage_pose_inference,
+    "dataframe_build": stage_dataframe_build,
+    "convert_to_bvh": stage_convert_to_bvh,
+    "write_bvh": stage_write_bvh,
+    "csv_export": stage_csv_export,
+    "csv_stream_gzip": stage_csv_stream,
+    "object_tracker": stage_object_tracker,
+    "object_tracker_redetect": stage_object_tracker_redetect,
+    **{f"tracker_{tier}": partial(stage_tracker_tier, tier=tier) for tier in TRACKER_TIERS},
+    "multi_object": stage_multi_object,
+    "live_stream": stage_live_stream,
+}
+
+
+def run_stage(stage, ctx, trace_memory=True):
+    """Times a stage, then reruns it under tracemalloc for peak memory
+
+    Tracing slows Python-heavy code a lot, so the two are measured in
+    separate passes.
+    """
+    frames, seconds = stage(ctx)
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            stage(ctx)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return {
+        "frames": frames,
+        "seconds": seconds,
+        "fps": frames / seconds if seconds else None,
+        "peak_mb": peak_mb,
+    }
+
+
+def run_benchmarks(sizes, lengths, stages, trace_memory=True):
+    results = []
+    with tempfile.TemporaryDirectory(prefix="m2c_bench_") as workdir:
+        for size in sizes:
+            width, height = RESOLUTIONS[size]
+            for length in lengths:
+                clip = f"{size}_{length}f"
+                video = make_synthetic_video(os.path.join(workdir, f"{clip}.mp4"),
+                                             width, height, length)
+                ctx = {"video": video, "frames": length, "size": (width, height),
+                       "workdir": workdir, "landmarks": synthetic_landmarks(length)}
+                # DataFrame-based stages need the build stage's output
+                if "dataframe_build" not in stages:
+                    stage_dataframe_build(ctx)
+                for name in stages:
+                    try:
+                        result = run_stage(STAGES[name], ctx, trace_memory)
+                    except Exception as e:
+                        # Keep going so one broken stage doesn't hide the rest
+                        result = {"frames": 0, "seconds": None, "fps": None,
+                                  "peak_mb": None, "error": str(e)}
+                    result.update({"clip": clip, "width": width, "height": height, "stage": name})
+                    results.append(result)
+                    if "error" in result:
+                        print(f"{clip:>12} {name:<22} failed: {result['error']}")
+                        continue
+                    print(f"{clip:>12} {name:<22} {result['fps'] or 0:10.1f} fps"
+                          + (f" {result['peak_mb']:8.1f} MB" if result['peak_mb'] is not None else ""))
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(old_path, new_path):
+    """Prints per-stage fps ratios between two result files"""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    baseline = {(r["clip"], r["stage"]): r for r in old["results"]}
+    print(f"{'clip':>12} {'stage':<22} {old['commit']:>10} {new['commit']:>10}  speedup")
+    for result in new["results"]:
+        before = baseline.get((result["clip"], result["stage"]))
+        if before is None or not before["fps"] or not result["fps"]:
+            continue
+        print(f"{result['clip']:>12} {result['stage']:<22} {before['fps']:10.1f} "
+              f"{result['fps']:10.1f}  {result['fps'] / before['fps']:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=sorted(RESOLUTIONS), default=["480p", "720p", "1080p"])
+    parser.add_argument("--lengths", nargs="+", type=int, default=list(DEFAULT_LENGTHS))
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="results file (default benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = _git_commit()
+    results = run_benchmarks(args.sizes, args.lengths, args.stages, not args.no_memory)
+    output = args.output or os.path.join("benchmark_results", f"{commit}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "results": results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,69 +1,125 @@
-def convert_to_bvh(joint_data, bvh_header=None):
-    """Converts joint data to BVH format for game engines"""
-    # BVH header (simplified skeleton)
-    bvh = """HIERARCHY
-ROOT Hips
-  JOINT LeftUpLeg
-    End Site
-  JOINT RightUpLeg
-    End Site
-MOTION
-Frames: {}\n""".format(len(joint_data))
+import io
+import os
 
-    # Add motion smoothing (3-frame average)
-    smoothed_data = joint_data.rolling(window=3).mean()
+import pandas as pd
 
-    for frame in smoothed_data.values:
-        bvh_header += " ".join([f"{val:.6f}" for val in frame]) + "\n"
+from kinematics import motion_channels
+from smoothing import smooth_dataframe
+from timeseries import resample
 
-
-def convert_to_bvh(joint_data):
-    """Convert joint data to BVH format"""
-    bvh_template = """HIERARCHY
+BVH_TEMPLATE = """HIERARCHY
 ROOT Hips
 {JOINT_DATA}
 MOTION
 Frames: {FRAME_COUNT}
-Frame Time: 0.033333
-{FRAME_DATA}"""
+Frame Time: {FRAME_TIME:.6f}
+"""
 
-    # Simplified skeleton - adjust as needed
-    joint_hierarchy = """
+# Simplified skeleton; kinematics.BVH_JOINTS must follow its channel order
+JOINT_HIERARCHY = """{
     OFFSET 0 0 0
     CHANNELS 6 Xposition Yposition Zposition Zrotation Xrotation Yrotation
     JOINT Chest
+    {
         OFFSET 0 5 0
         CHANNELS 3 Zrotation Xrotation Yrotation
         JOINT Neck
+        {
             OFFSET 0 5 0
             CHANNELS 3 Zrotation Xrotation Yrotation
             JOINT Head
+            {
                 OFFSET 0 2 0
                 CHANNELS 3 Zrotation Xrotation Yrotation
                 End Site
+                {
                     OFFSET 0 2 0
+                }
+            }
+        }
         JOINT LeftShoulder
+        {
             OFFSET -2 5 0
             CHANNELS 3 Zrotation Xrotation Yrotation
             JOINT LeftElbow
+            {
                 OFFSET -3 0 0
                 CHANNELS 3 Zrotation Xrotation Yrotation
                 End Site
+                {
                     OFFSET -3 0 0
+                }
+            }
+        }
         JOINT RightShoulder
+        {
             OFFSET 2 5 0
             CHANNELS 3 Zrotation Xrotation Yrotation
             JOINT RightElbow
+            {
                 OFFSET 3 0 0
                 CHANNELS 3 Zrotation Xrotation Yrotation
                 End Site
-                    OFFSET 3 0 0"""
+                {
+                    OFFSET 3 0 0
+                }
+            }
+        }
+    }
+}"""
+
+FRAME_TIME = 1 / 30
+BLOCK_SIZE = 2048
+
+
+def _format_block(block, precision):
+    """Formats a block of frame rows as space-separated lines
+
+    pandas' C CSV writer does the float formatting for the whole block,
+    which is far faster than joining Python strings row by row.
+    """
+    return pd.DataFrame(block).to_csv(sep=" ", header=False, index=False,
+                                      float_format=f"%.{precision}f",
+                                      lineterminator="\n")
 
-    # Convert joint data to BVH frame format
-    frame_data = "\n".join([" ".join(map(str, frame)) for frame in joint_data.values])
 
-    return bvh_template.format(
-        JOINT_DATA=joint_hierarchy,
-        FRAME_COUNT=len(joint_data),
-        FRAME_DATA=frame_data
-    )
\ No newline at end of file
+def iter_bvh(joint_data, precision=6, block_size=BLOCK_SIZE, frame_time=None,
+             smoothing=None, smoothing_options=None):
+    """Yields BVH text in chunks: the header, then blocks of frame rows
+
+    Landmark positions are solved into root translation and per-joint
+    ZXY rotations for JOINT_HIERARCHY (see ``kinematics``) in one batch
+    before anything is written. ``frame_time`` defaults to the ``fps``
+    attr, else FRAME_TIME. Positions are first resampled onto that frame
+    time (see ``timeseries.resample``), so frames without a detected
+    pose keep their place instead of speeding playback up. ``smoothing``
+    names a method from ``smoothing.SMOOTHING_METHODS``, applied to the
+    positions first.
+    """
+    joint_data = smooth_dataframe(joint_data, smoothing, **(smoothing_options or {}))
+    if frame_time is None:
+        fps = joint_data.attrs.get("fps")
+        frame_time = 1.0 / fps if fps else FRAME_TIME
+    values = motion_channels(resample(joint_data, 1.0 / frame_time))
+    yield BVH_TEMPLATE.format(JOINT_DATA=JOINT_HIERARCHY,
+                              FRAME_COUNT=len(values),
+                              FRAME_TIME=frame_time)
+
+    for start in range(0, len(values), block_size):
+        yield _format_block(values[start:start + block_size], precision)
+
+
+def write_bvh(joint_data, out, **kwargs):
+    """Streams BVH to a path or an open text or binary file"""
+    if isinstance(out, (str, os.PathLike)):
+        with open(out, "w", encoding="utf-8", newline="") as f:
+            return write_bvh(joint_data, f, **kwargs)
+
+    binary = not isinstance(out, io.TextIOBase) and "b" in getattr(out, "mode", "b")
+    for chunk in iter_bvh(joint_data, **kwargs):
+        out.write(chunk.encode("utf-8") if binary else chunk)
+
+
+def convert_to_bvh(joint_data, **kwargs):
+    """Convert joint data to BVH format"""
+    return "".join(iter_bvh(joint_data, **kwargs))
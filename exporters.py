@@ -0,0 +1,210 @@
+import io
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from servo import arduino_sketch, joint_angles
+from smoothing import smooth_dataframe
+from timeseries import frame_timestamps
+from trajectory import iter_joint_trajectory
+
+# Raw format: fixed little-endian header, then the UTF-8 column names
+# ("\n"-joined), then optionally one uint32 source frame index per frame,
+# then frames x channels float32 values in row-major order.
+RAW_MAGIC = b"M2CR"
+RAW_VERSION = 1
+RAW_HAS_FRAME_INDEX = 0x1
+# magic, version, flags, frames, channels, fps, names byte length
+RAW_HEADER = struct.Struct("<4sHHIIfI")
+
+CSV_CHUNK_ROWS = 4096
+
+
+@contextmanager
+def _binary_file(target, mode):
+    """Yields a binary file for a path, or passes an open file through"""
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, mode) as f:
+            yield f
+    else:
+        yield target
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet/Feather export needs pyarrow (pip install pyarrow)")
+
+
+def _float32_values(df):
+    return np.ascontiguousarray(df.to_numpy(), dtype=np.float32)
+
+
+def _arrow_table(df):
+    pa = _require_pyarrow()
+    # Transposing once gives contiguous per-column buffers pyarrow can wrap
+    columns = np.ascontiguousarray(_float32_values(df).T)
+    arrays = [pa.array(np.asarray(df.index, dtype=np.int64))]
+    arrays += [pa.array(column) for column in columns]
+    names = [df.index.name or "frame"] + [str(c) for c in df.columns]
+    return pa.Table.from_arrays(arrays, names=names).replace_schema_metadata(
+        {"fps": str(df.attrs.get("fps", 0.0))})
+
+
+def export_npz(df, out):
+    """Writes values, columns, frame index and fps to an .npz archive"""
+    with _binary_file(out, "wb") as f:
+        np.savez(f,
+                 values=_float32_values(df),
+                 columns=np.array(df.columns, dtype=str),
+                 frame=np.asarray(df.index, dtype=np.int64),
+                 fps=np.float32(df.attrs.get("fps", 0.0)))
+
+
+def export_parquet(df, out):
+    """Writes a Parquet file with a frame column plus one float32 column per channel"""
+    table = _arrow_table(df)
+    import pyarrow.parquet as pq
+    with _binary_file(out, "wb") as f:
+        pq.write_table(table, f)
+
+
+def export_feather(df, out):
+    """Writes a Feather (Arrow IPC) file laid out like the Parquet export"""
+    table = _arrow_table(df)
+    import pyarrow.feather as feather
+    with _binary_file(out, "wb") as f:
+        feather.write_feather(table, f)
+
+
+def export_raw(df, out):
+    """Writes the raw little-endian float32 format (see RAW_HEADER)"""
+    values = _float32_values(df).astype("<f4", copy=False)
+    names = "\n".join(str(c) for c in df.columns).encode("utf-8")
+    frames = np.asarray(df.index, dtype="<u4")
+    with _binary_file(out, "wb") as f:
+        f.write(RAW_HEADER.pack(RAW_MAGIC, RAW_VERSION, RAW_HAS_FRAME_INDEX,
+                                values.shape[0], values.shape[1],
+                                float(df.attrs.get("fps", 0.0)), len(names)))
+        f.write(names)
+        f.write(frames.data)
+        f.write(values.data)
+
+
+def read_raw(source):
+    """Reads a raw export back into a DataFrame"""
+    with _binary_file(source, "rb") as f:
+        magic, version, flags, frames, channels, fps, names_len = RAW_HEADER.unpack(
+            f.read(RAW_HEADER.size))
+        if magic != RAW_MAGIC or version != RAW_VERSION:
+            raise ValueError("Not a motion2code raw export (or unsupported version)")
+        names = f.read(names_len).decode("utf-8").split("\n") if names_len else []
+        index = None
+        if flags & RAW_HAS_FRAME_INDEX:
+            index = np.frombuffer(f.read(4 * frames), dtype="<u4").astype(np.int64)
+        values = np.frombuffer(f.read(4 * frames * channels), dtype="<f4").reshape(frames, channels)
+
+    df = pd.DataFrame(values, columns=names,
+                      index=pd.Index(index, name="frame") if index is not None else None)
+    df.attrs["fps"] = fps
+    return df
+
+
+def iter_csv(df, precision=6, chunk_rows=CSV_CHUNK_ROWS,
+             include_frame=False, include_timestamp=False, compress=False,
+             smoothing=None, smoothing_options=None):
+    """Yields CSV bytes in row chunks, optionally gzip-compressed on the fly
+
+    Only one chunk of text is alive at a time, so memory stays flat however
+    long the clip is. The header goes out first; with ``compress`` every
+    chunk is sync-flushed so bytes reach the client straight away.
+    ``include_timestamp`` adds seconds since the first row, from decoder
+    timestamps where known (see ``timeseries.frame_timestamps``), so the
+    CSV and trajectory exports agree on time. ``smoothing`` names a method from
+    ``smoothing.SMOOTHING_METHODS``.
+    """
+    df = smooth_dataframe(df, smoothing, **(smoothing_options or {}))
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    def encode(text):
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    columns = [str(c) for c in df.columns]
+    prefix = (["frame"] if include_frame else []) + (["timestamp_s"] if include_timestamp else [])
+    yield encode(",".join(prefix + columns) + "\n")
+
+    frames = np.asarray(df.index, dtype=np.int64)
+    timestamps = frame_timestamps(df) if include_timestamp else None
+    float_format = f"%.{precision}f"
+    for start in range(0, len(df), chunk_rows):
+        stop = start + chunk_rows
+        # Sliced per column, so integer columns (object_id) stay integers
+        block = df.iloc[start:stop].reset_index(drop=True)
+        block.columns = columns
+        if include_timestamp:
+            block.insert(0, "timestamp_s", timestamps[start:stop])
+        if include_frame:
+            block.insert(0, "frame", frames[start:stop])
+        yield encode(block.to_csv(header=False, index=False, float_format=float_format,
+                                  lineterminator="\n"))
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def export_csv(df, out, **kwargs):
+    """Streams CSV (see iter_csv) to a path or binary file"""
+    with _binary_file(out, "wb") as f:
+        for chunk in iter_csv(df, **kwargs):
+            f.write(chunk)
+
+
+def export_joint_angles(df, out, **kwargs):
+    """Streams per-joint flexion angles (see servo.joint_angles) as CSV"""
+    export_csv(joint_angles(df), out, **kwargs)
+
+
+def export_arduino(df, out, **kwargs):
+    """Writes an Arduino servo playback sketch (see servo.arduino_sketch)"""
+    with _binary_file(out, "wb") as f:
+        f.write(arduino_sketch(df, **kwargs).encode("utf-8"))
+
+
+def export_joint_trajectory(df, out, **kwargs):
+    """Streams a fixed-rate ROS JointTrajectory (see trajectory.iter_joint_trajectory)"""
+    with _binary_file(out, "wb") as f:
+        for chunk in iter_joint_trajectory(df, **kwargs):
+            f.write(chunk)
+
+
+# name -> (writer, file extension, mime type)
+EXPORT_FORMATS = {
+    "csv": (export_csv, "csv", "text/csv"),
+    "csv.gz": (partial(export_csv, compress=True), "csv.gz", "application/gzip"),
+    "npz": (export_npz, "npz", "application/octet-stream"),
+    "parquet": (export_parquet, "parquet", "application/vnd.apache.parquet"),
+    "feather": (export_feather, "feather", "application/vnd.apache.arrow.file"),
+    "raw": (export_raw, "f32", "application/octet-stream"),
+    "angles.csv": (export_joint_angles, "angles.csv", "text/csv"),
+    "arduino": (export_arduino, "ino", "text/plain"),
+    "ros.json": (partial(export_joint_trajectory, fmt="json"), "trajectory.json", "application/json"),
+    "ros.yaml": (partial(export_joint_trajectory, fmt="yaml"), "trajectory.yaml", "application/yaml"),
+}
+
+
+def export_bytes(df, fmt, **kwargs):
+    """Runs an exporter into memory and returns the bytes"""
+    writer = EXPORT_FORMATS[fmt][0]
+    buffer = io.BytesIO()
+    writer(df, buffer, **kwargs)
+    return buffer.getvalue()
@@ -0,0 +1,129 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+# Threads rather than processes: OpenCV and MediaPipe release the GIL while
+# they work, results stay in-process for the page to render, and jobs share
+# the process-wide Pose pool.
+DEFAULT_WORKERS = int(os.environ.get("MOTION2CODE_JOB_WORKERS", "2"))
+DEFAULT_MAX_QUEUED = int(os.environ.get("MOTION2CODE_MAX_QUEUED_JOBS", "8"))
+FINISHED_JOB_TTL = 15 * 60  # seconds a finished job's result is kept
+PRUNE_INTERVAL = 60  # seconds between sweeps for expired jobs
+
+
+class QueueFullError(RuntimeError):
+    """Raised when admission control turns a submission away"""
+
+
+class Job:
+    """State of one submitted conversion, as seen by the polling page"""
+
+    def __init__(self, job_id: str):
+        self.id = job_id
+        self.status = "queued"  # queued -> running -> done | failed | cancelled
+        self.progress = (0, 0, "queued")  # (frames done, total frames, stage)
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self._future = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in ("queued", "running")
+
+    def report_progress(self, done: int, total: int, stage: str) -> None:
+        self.progress = (done, total, stage)
+
+
+class JobQueue:
+    """Bounded worker pool that runs conversions off the Streamlit script thread
+
+    At most ``workers`` jobs run at once and at most ``max_queued`` more
+    wait; beyond that ``submit`` raises ``QueueFullError`` so a burst of
+    uploads is turned away instead of piling up on the server.
+
+    Finished jobs (and their results) are dropped ``FINISHED_JOB_TTL``
+    seconds after they finish, by a background sweep and on every read.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queued: int = DEFAULT_MAX_QUEUED):
+        self.workers = workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="motion2code-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        threading.Thread(target=self._sweep, name="motion2code-job-sweep", daemon=True).start()
+
+    def _sweep(self) -> None:
+        while not self._closed.wait(PRUNE_INTERVAL):
+            with self._lock:
+                self._prune()
+
+    def close(self) -> None:
+        """Stops the sweep and lets running jobs finish"""
+        self._closed.set()
+        self._executor.shutdown(wait=False)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """Queues ``fn(*args, progress=..., **kwargs)`` and returns the job id"""
+        with self._lock:
+            self._prune()
+            queued = sum(1 for job in self._jobs.values() if job.status == "queued")
+            if queued >= self.max_queued:
+                raise QueueFullError(f"{queued} conversions are already waiting; try again shortly")
+            job = Job(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job: Job, fn: Callable, args, kwargs) -> None:
+        if job.status == "cancelled":
+            return
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = fn(*args, progress=job.report_progress, **kwargs)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancels a job that hasn't started yet"""
+        job = self.get(job_id)
+        if job is None or job.status != "queued" or not job._future.cancel():
+            return False
+        job.status = "cancelled"
+        job.finished = time.time()
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._prune()
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            'workers': self.workers,
+            'max_queued': self.max_queued,
+            'queued': statuses.count("queued"),
+            'running': statuses.count("running"),
+        }
+
+    def _prune(self) -> None:
+        """Drops expired finished jobs; call with ``_lock`` held"""
+        cutoff = time.time() - FINISHED_JOB_TTL
+        for job_id in [job.id for job in self._jobs.values()
+                       if job.finished is not None and job.finished < cutoff]:
+            del self._jobs[job_id]
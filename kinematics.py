@@ -0,0 +1,204 @@
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Motion channel order of bvh_converter.JOINT_HIERARCHY: Hips has position
+# plus rotation, every other joint rotation only (all Z, X, Y)
+BVH_JOINTS = ["Hips", "Chest", "Neck", "Head",
+              "LeftShoulder", "LeftElbow", "RightShoulder", "RightElbow"]
+
+REQUIRED_LANDMARKS = ["LEFT_HIP", "RIGHT_HIP", "LEFT_SHOULDER", "RIGHT_SHOULDER"]
+# Every landmark the solver reads; joints whose landmarks are missing stay at rest
+SOLVER_LANDMARKS = REQUIRED_LANDMARKS + ["LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_WRIST", "RIGHT_WRIST",
+                                         "LEFT_EAR", "RIGHT_EAR", "NOSE"]
+
+# Hips to shoulder line in skeleton units (Chest + Neck offsets)
+SKELETON_TORSO_LENGTH = 10.0
+
+# Rest direction of each limb bone in its joint's local frame
+LEFT_BONE_REST = np.array([-1.0, 0.0, 0.0])
+RIGHT_BONE_REST = np.array([1.0, 0.0, 0.0])
+
+
+def axis_scale(joint_data: pd.DataFrame) -> np.ndarray:
+    """Per-axis factors that put normalized landmarks into common units
+
+    MediaPipe normalizes x (and z) by frame width but y by frame height;
+    with the ``frame_size`` attr y is rescaled to width units.
+    """
+    size = joint_data.attrs.get("frame_size")
+    if size is None:
+        return np.ones(3)
+    width, height = size
+    return np.array([1.0, height / width if width else 1.0, 1.0])
+
+
+def landmark_columns(joint_data: pd.DataFrame, name: str) -> Optional[List[str]]:
+    """X/Y/Z columns for a landmark, by name or as Joint_<index>
+
+    Results extracted without ``joints_to_track`` label every landmark by
+    its MediaPipe index instead of its name.
+    """
+    columns = [f"{name}_{axis}" for axis in ("X", "Y", "Z")]
+    if all(column in joint_data.columns for column in columns):
+        return columns
+    if "Joint_0_X" in joint_data.columns:
+        # Imported late: exporters and the BVH writer shouldn't pull in mediapipe
+        from pose_extractor import joint_indices
+        index = int(joint_indices([name])[0])
+        columns = [f"Joint_{index}_{axis}" for axis in ("X", "Y", "Z")]
+        if all(column in joint_data.columns for column in columns):
+            return columns
+    return None
+
+
+def world_positions(joint_data: pd.DataFrame,
+                    names: Sequence[str] = SOLVER_LANDMARKS) -> Dict[str, np.ndarray]:
+    """(frames, 3) Y-up positions of each of ``names`` present in ``joint_data``
+
+    MediaPipe image axes point right, down and away from the camera; the
+    skeleton is Y-up with the subject's left on -X, so the mapping is
+    (-x, -y, z), which keeps the frame right-handed.
+    """
+    scale = axis_scale(joint_data) * [-1.0, -1.0, 1.0]
+    positions = {}
+    for name in names:
+        columns = landmark_columns(joint_data, name)
+        if columns is not None:
+            positions[name] = joint_data[columns].to_numpy(dtype=np.float64) * scale
+    return positions
+
+
+def _normalize(v: np.ndarray) -> np.ndarray:
+    return v / np.maximum(np.linalg.norm(v, axis=-1, keepdims=True), 1e-9)
+
+
+def _transpose(rotations: np.ndarray) -> np.ndarray:
+    return rotations.transpose(0, 2, 1)
+
+
+def _frames_from_axes(x_hint: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """(frames, 3, 3) rotations with columns x, y, z from a primary y axis
+
+    ``x_hint`` is made orthogonal to ``y``; z completes a right-handed frame.
+    """
+    y = _normalize(y)
+    x = _normalize(x_hint - np.einsum('ni,ni->n', x_hint, y)[:, None] * y)
+    z = np.cross(x, y)
+    return np.stack([x, y, z], axis=-1)
+
+
+def swing_rotation(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Shortest-arc rotations taking unit vectors ``a`` onto ``b``, (n, 3, 3)
+
+    ``a`` may be a single vector shared by every frame.
+    """
+    a = np.broadcast_to(a, b.shape)
+    v = np.cross(a, b)
+    c = np.einsum('ni,ni->n', a, b)
+    skew = np.zeros(b.shape[:1] + (3, 3))
+    skew[:, 0, 1], skew[:, 0, 2] = -v[:, 2], v[:, 1]
+    skew[:, 1, 0], skew[:, 1, 2] = v[:, 2], -v[:, 0]
+    skew[:, 2, 0], skew[:, 2, 1] = -v[:, 1], v[:, 0]
+    scale = 1.0 / np.maximum(1.0 + c, 1e-9)
+    rotations = np.eye(3) + skew + skew @ skew * scale[:, None, None]
+
+    # Opposite vectors: half turn about any axis perpendicular to a
+    flipped = c < -1.0 + 1e-6
+    if flipped.any():
+        axis = np.cross(a[flipped], [0.0, 0.0, 1.0])
+        axis = np.where(np.linalg.norm(axis, axis=1, keepdims=True) < 1e-6,
+                        np.cross(a[flipped], [0.0, 1.0, 0.0]), axis)
+        axis = _normalize(axis)
+        rotations[flipped] = 2 * np.einsum('ni,nj->nij', axis, axis) - np.eye(3)
+    return rotations
+
+
+def euler_zxy(rotations: np.ndarray) -> np.ndarray:
+    """Degrees (z, x, y) with R = Rz(z) Rx(x) Ry(y), BVH's ZXY channel order
+
+    Angles are unwrapped along the frame axis so they never jump by 360.
+    """
+    r21 = np.clip(rotations[:, 2, 1], -1.0, 1.0)
+    x = np.arcsin(r21)
+    y = np.arctan2(-rotations[:, 2, 0], rotations[:, 2, 2])
+    z = np.arctan2(-rotations[:, 0, 1], rotations[:, 1, 1])
+
+    # Gimbal lock (x = +-90): fold y into z
+    locked = np.abs(r21) > 1.0 - 1e-6
+    y[locked] = 0.0
+    z[locked] = np.arctan2(rotations[locked, 1, 0], rotations[locked, 0, 0])
+    return np.degrees(np.unwrap(np.stack([z, x, y], axis=1), axis=0))
+
+
+def _limb_rotations(parent_world: np.ndarray,
+                    start: Optional[np.ndarray],
+                    end: Optional[np.ndarray],
+                    rest: np.ndarray) -> np.ndarray:
+    """Local swing rotation of a bone, identity when a landmark is missing"""
+    if start is None or end is None:
+        return np.broadcast_to(np.eye(3), parent_world.shape).copy()
+    target = np.einsum('nji,nj->ni', parent_world, _normalize(end - start))  # into parent frame
+    return swing_rotation(rest, target)
+
+
+def solve_rotations(joint_data: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Local (frames, 3, 3) rotation of every BVH joint, plus root position
+
+    Hips and Chest frames come from the hip and shoulder lines around the
+    spine, the Head frame from the ears and nose, and limbs are shortest-
+    arc swings from their rest direction. Joints whose landmarks aren't
+    in ``joint_data`` stay at rest. Returns a dict keyed by joint name,
+    with ``"position"`` holding the root translation in skeleton units.
+    """
+    p = world_positions(joint_data)
+    missing = [name for name in REQUIRED_LANDMARKS if name not in p]
+    if missing:
+        raise ValueError(f"BVH rotations need {', '.join(missing)} in the joint data")
+    frames = len(joint_data)
+    identity = np.broadcast_to(np.eye(3), (frames, 3, 3))
+
+    mid_hip = (p["LEFT_HIP"] + p["RIGHT_HIP"]) / 2
+    mid_shoulder = (p["LEFT_SHOULDER"] + p["RIGHT_SHOULDER"]) / 2
+    spine = mid_shoulder - mid_hip
+    torso = np.median(np.linalg.norm(spine, axis=1)) if frames else 1.0
+    scale = SKELETON_TORSO_LENGTH / max(torso, 1e-9)
+
+    hips_world = _frames_from_axes(p["RIGHT_HIP"] - p["LEFT_HIP"], spine)
+    chest_world = _frames_from_axes(p["RIGHT_SHOULDER"] - p["LEFT_SHOULDER"], spine)
+    neck_world = chest_world  # no landmarks between shoulders and head
+
+    local = {
+        "Hips": hips_world,
+        "Chest": _transpose(hips_world) @ chest_world,
+        "Neck": identity.copy(),
+        "Head": identity.copy(),
+    }
+    if all(name in p for name in ("LEFT_EAR", "RIGHT_EAR", "NOSE")):
+        # The rest pose faces -Z, so z runs from the nose back to the ears
+        back = (p["LEFT_EAR"] + p["RIGHT_EAR"]) / 2 - p["NOSE"]
+        right = p["RIGHT_EAR"] - p["LEFT_EAR"]
+        x = _normalize(right)
+        z = _normalize(back - np.einsum('ni,ni->n', back, x)[:, None] * x)
+        head_world = np.stack([x, np.cross(z, x), z], axis=-1)
+        local["Head"] = _transpose(neck_world) @ head_world
+
+    for side, rest in (("Left", LEFT_BONE_REST), ("Right", RIGHT_BONE_REST)):
+        prefix = side.upper()
+        shoulder = _limb_rotations(chest_world, p.get(f"{prefix}_SHOULDER"),
+                                   p.get(f"{prefix}_ELBOW"), rest)
+        shoulder_world = chest_world @ shoulder
+        local[f"{side}Shoulder"] = shoulder
+        local[f"{side}Elbow"] = _limb_rotations(shoulder_world, p.get(f"{prefix}_ELBOW"),
+                                                p.get(f"{prefix}_WRIST"), rest)
+
+    local["position"] = mid_hip * scale
+    return local
+
+
+def motion_channels(joint_data: pd.DataFrame) -> np.ndarray:
+    """(frames, 6 + 3 * 7) BVH MOTION values in the hierarchy's channel order"""
+    solved = solve_rotations(joint_data)
+    channels = [solved["position"]] + [euler_zxy(solved[joint]) for joint in BVH_JOINTS]
+    return np.concatenate(channels, axis=1)
@@ -0,0 +1,309 @@
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+import pandas as pd
+
+from pose_extractor import FrameEnhancer, LandmarkBuffer, _working_size
+from pose_pool import PosePool
+
+DEFAULT_RING_SIZE = 4
+DEFAULT_LATENCY_BUDGET = 0.15  # seconds from capture to the start of inference
+# Live frames only need to be big enough for MediaPipe's own input size
+LIVE_MAX_DIMENSION = 640
+
+
+def draw_stick_figure(frame: np.ndarray, index: int, fps: float) -> np.ndarray:
+    """Draws frame ``index`` of a walking stick figure onto ``frame`` in place"""
+    height, width = frame.shape[:2]
+    unit = height / 10
+    phase = 2 * np.pi * index / fps
+    cx = int(width / 2 + unit * np.sin(phase / 4))
+    hip = (cx, int(6 * unit))
+    neck = (cx, int(3 * unit))
+    cv2.circle(frame, (cx, int(2.3 * unit)), int(0.6 * unit), (200, 180, 160), -1)
+    cv2.line(frame, hip, neck, (220, 220, 220), max(2, int(unit / 4)))
+    for side in (-1, 1):
+        swing = side * np.sin(phase)
+        elbow = (int(cx + side * unit * 1.2), int(3.5 * unit + unit * swing))
+        wrist = (int(cx + side * unit * 2.2), int(3.5 * unit + 1.5 * unit * swing))
+        knee = (int(cx + side * unit * 0.6), int(7.5 * unit))
+        ankle = (int(cx + side * unit * (0.6 + 0.3 * swing)), int(9 * unit))
+        for a, b in ((neck, elbow), (elbow, wrist), (hip, knee), (knee, ankle)):
+            cv2.line(frame, a, b, (220, 220, 220), max(2, int(unit / 5)))
+    return frame
+
+
+class CameraSource:
+    """BGR frames from a local capture device"""
+
+    def __init__(self, device: Union[int, str] = 0,
+                 width: Optional[int] = None,
+                 height: Optional[int] = None):
+        self.device = device
+        self.width = width
+        self.height = height
+        self.fps = 0.0
+
+    def __iter__(self):
+        cap = cv2.VideoCapture(self.device)
+        if not cap.isOpened():
+            raise RuntimeError(f"Can't open camera {self.device!r}")
+        try:
+            if self.width:
+                cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            if self.height:
+                cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.fps = max(float(cap.get(cv2.CAP_PROP_FPS)), 0.0)
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                yield frame
+        finally:
+            cap.release()
+
+
+class SyntheticSource:
+    """Stand-in camera for local testing: a stick figure over textured noise
+
+    Frames are paced at ``fps`` in real time (unless ``realtime`` is off)
+    so dropping and latency behave as they would with a camera. ``length``
+    limits the stream; None runs until the stream is stopped.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0,
+                 length: Optional[int] = None, realtime: bool = True, seed: int = 1234):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.length = length
+        self.realtime = realtime
+        self.seed = seed
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        background = cv2.GaussianBlur(
+            rng.integers(0, 255, (self.height, self.width, 3), dtype=np.uint8), (0, 0), 5)
+        due = time.perf_counter()
+        index = 0
+        while self.length is None or index < self.length:
+            if self.realtime:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                due += 1.0 / self.fps
+            yield draw_stick_figure(background.copy(), index, self.fps)
+            index += 1
+
+
+class LiveStream:
+    """Incremental pose extraction over a live frame source
+
+    A capture thread pushes frames from ``source`` (any iterable of BGR
+    frames, e.g. ``CameraSource`` or ``SyntheticSource``) into a ring
+    buffer of ``ring_size`` slots. When inference falls behind, the
+    oldest frames are overwritten instead of queueing up. The inference
+    thread always takes the newest frame and drops it if it is already
+    older than ``latency_budget`` seconds, so landmarks never trail the
+    camera by more than about one inference.
+
+    Landmarks are available while the stream runs through ``latest`` and
+    ``to_dataframe``, indexed by capture sequence number.
+
+    Without a ``pose_pool`` the stream runs its own single Pose tracker,
+    so a long-lived stream never holds one of the shared pool's. With
+    ``idle_timeout`` the stream stops itself once ``heartbeat`` hasn't
+    been called for that many seconds (e.g. its viewer went away).
+    """
+
+    def __init__(self,
+                 source: Iterable[np.ndarray],
+                 pose_pool: Optional[PosePool] = None,
+                 ring_size: int = DEFAULT_RING_SIZE,
+                 latency_budget: float = DEFAULT_LATENCY_BUDGET,
+                 max_dimension: Optional[int] = LIVE_MAX_DIMENSION,
+                 enhancer: Optional[FrameEnhancer] = None,
+                 idle_timeout: Optional[float] = None):
+        self.source = source
+        self._owns_pool = pose_pool is None
+        self.pose_pool = pose_pool or PosePool(size=1)
+        self.idle_timeout = idle_timeout
+        self._heartbeat = time.perf_counter()
+        self.latency_budget = latency_budget
+        self.max_dimension = max_dimension
+        self.enhancer = enhancer or FrameEnhancer()
+        self.error = None
+
+        self._ring = deque(maxlen=ring_size)  # (sequence, capture time, frame)
+        self._ring_changed = threading.Condition()
+        self._stopping = threading.Event()
+        self._source_done = threading.Event()
+        self._threads = []
+
+        self._lock = threading.Lock()  # guards the buffer, latencies and processed
+        self._buffer = LandmarkBuffer()
+        self._latest = None
+        self._latencies = deque(maxlen=256)
+        self._started = None
+        self.processed = 0
+        self.captured = 0  # captured and dropped are guarded by _ring_changed
+        self.dropped = 0
+
+    def __enter__(self) -> "LiveStream":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self) -> "LiveStream":
+        if self._threads:
+            raise RuntimeError("LiveStream can only be started once")
+        self._started = time.perf_counter()
+        self._threads = [threading.Thread(target=self._capture, name="motion2code-live-capture", daemon=True),
+                         threading.Thread(target=self._infer, name="motion2code-live-infer", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        with self._ring_changed:
+            self._ring_changed.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def heartbeat(self) -> None:
+        """Marks the stream as still watched (see ``idle_timeout``)"""
+        self._heartbeat = time.perf_counter()
+
+    def _check_idle(self) -> bool:
+        """Stops the stream once the heartbeat is overdue; True if stopping"""
+        if (self.idle_timeout is not None and not self._stopping.is_set()
+                and time.perf_counter() - self._heartbeat > self.idle_timeout):
+            self.error = f"stopped after {self.idle_timeout:.0f}s without a viewer"
+            self._stopping.set()
+        return self._stopping.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Blocks until a finite source is exhausted and its frames handled"""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _capture(self) -> None:
+        try:
+            for sequence, frame in enumerate(self.source):
+                if self._check_idle():
+                    break
+                with self._ring_changed:
+                    if len(self._ring) == self._ring.maxlen:
+                        self.dropped += 1  # oldest slot gets overwritten
+                    self._ring.append((sequence, time.perf_counter(), frame))
+                    self.captured += 1
+                    self._ring_changed.notify()
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._source_done.set()
+            with self._ring_changed:
+                self._ring_changed.notify_all()
+
+    def _next_frame(self) -> Optional[Tuple[int, float, np.ndarray]]:
+        """Newest buffered frame, dropping older ones; None once finished"""
+        with self._ring_changed:
+            while not self._ring:
+                if self._check_idle() or self._source_done.is_set():
+                    return None
+                self._ring_changed.wait(0.1)
+            if self._stopping.is_set():
+                return None
+            newest = self._ring.pop()
+            self.dropped += len(self._ring)
+            self._ring.clear()
+            return newest
+
+    def _infer(self) -> None:
+        size = None
+        try:
+            with self.pose_pool.checkout() as pose:
+                while True:
+                    item = self._next_frame()
+                    if item is None:
+                        break
+                    sequence, captured_at, frame = item
+                    if time.perf_counter() - captured_at > self.latency_budget:
+                        with self._ring_changed:
+                            self.dropped += 1
+                        continue
+
+                    if size is None:
+                        size = _working_size(frame.shape[1], frame.shape[0], self.max_dimension) or ()
+                    if size:
+                        frame = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+                    results = pose.process(self.enhancer(frame, rgb=True))
+                    latency = time.perf_counter() - captured_at
+
+                    with self._lock:
+                        if results.pose_landmarks:
+                            self._buffer.append(sequence, results.pose_landmarks.landmark)
+                            self._latest = (sequence, self._buffer.landmarks[-1].copy())
+                        self.processed += 1
+                        self._latencies.append(latency)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if self._owns_pool:
+                self.pose_pool.close()
+
+    def latest(self) -> Optional[Tuple[int, np.ndarray]]:
+        """(sequence number, raw (33, 4) landmarks) of the newest detection"""
+        with self._lock:
+            return self._latest
+
+    def to_dataframe(self, joints_to_track: Optional[List[str]] = None,
+                     last: Optional[int] = None) -> pd.DataFrame:
+        """Calibrated landmarks so far (or the ``last`` n detections)"""
+        with self._lock:
+            buffer = self._buffer
+            if last is not None and len(buffer) > last:
+                buffer = LandmarkBuffer.from_arrays(buffer.frame_indices[-last:],
+                                                    buffer.landmarks[-last:])
+            df = buffer.to_dataframe(joints_to_track)
+        df.attrs["fps"] = self.capture_fps()
+        return df
+
+    def capture_fps(self) -> float:
+        fps = getattr(self.source, "fps", 0.0)
+        if fps:
+            return float(fps)
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return self.captured / elapsed if elapsed else 0.0
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = np.array(self._latencies)
+            detected = len(self._buffer)
+        return {
+            'captured': self.captured,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'detected': detected,
+            'latency_mean': float(latencies.mean()) if len(latencies) else None,
+            'latency_p95': float(np.percentile(latencies, 95)) if len(latencies) else None,
+            'capture_fps': self.capture_fps(),
+        }
+
+
+if __name__ == "__main__":
+    # Five seconds of synthetic "camera" input through the live pipeline
+    with LiveStream(SyntheticSource(length=150)) as stream:
+        stream.wait()
+    print(stream.stats())
+    print(stream.to_dataframe().head())
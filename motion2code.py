@@ -0,0 +1,293 @@
+"""Batch conversion of videos to motion data
+
+Takes video files, globs or directories, extracts motion from each one in
+a pool of worker processes and writes the chosen export formats to an
+output directory:
+
+    python motion2code.py clips/ -o out -f csv bvh
+    python motion2code.py "shoots/**/*.mp4" -f ros.yaml --jobs 4
+    python motion2code.py clips/ --mode object -f parquet
+
+Outputs are written atomically and recorded in a manifest in the output
+directory, so re-running the same command skips videos whose outputs are
+up to date and picks up where an interrupted run stopped.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from bvh_converter import write_bvh
+from exporters import EXPORT_FORMATS
+from object_tracker import DEFAULT_TRACKER_TIER, TRACKER_TIERS
+from pose_extractor import DEFAULT_MAX_DIMENSION, _video_info, process_video
+from result_cache import ResultCache
+from smoothing import SMOOTHING_METHODS, smooth_dataframe
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".avi", ".mkv", ".webm", ".m4v", ".mpg", ".mpeg")
+MODES = ("human", "object", "multi_object")
+MANIFEST_NAME = ".motion2code-manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_JOBS = int(os.environ.get("MOTION2CODE_BATCH_JOBS", "0")) or os.cpu_count() or 1
+
+# name -> (writer, file extension): every exporter plus BVH
+BATCH_FORMATS = {name: (writer, extension) for name, (writer, extension, _) in EXPORT_FORMATS.items()}
+BATCH_FORMATS["bvh"] = (write_bvh, "bvh")
+
+
+def expand_inputs(inputs: List[str]) -> List[Tuple[str, str]]:
+    """(video path, output name) for every video in files, globs and directories
+
+    Videos found under a directory keep their path relative to it (minus
+    the extension) as output name, so same-named clips in different
+    folders don't collide. Duplicates are dropped; order is sorted.
+    Two different videos mapping to the same output name is an error.
+    """
+    videos = {}
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            for root, _, files in os.walk(pattern):
+                for name in files:
+                    if name.lower().endswith(VIDEO_EXTENSIONS):
+                        path = os.path.join(root, name)
+                        videos.setdefault(os.path.abspath(path),
+                                          os.path.splitext(os.path.relpath(path, pattern))[0])
+        elif glob.has_magic(pattern):
+            for path in glob.glob(pattern, recursive=True):
+                if os.path.isfile(path):
+                    videos.setdefault(os.path.abspath(path),
+                                      os.path.splitext(os.path.basename(path))[0])
+        elif os.path.isfile(pattern):
+            videos.setdefault(os.path.abspath(pattern),
+                              os.path.splitext(os.path.basename(pattern))[0])
+        else:
+            raise FileNotFoundError(f"No such video, directory or match: {pattern}")
+
+    owners = {}
+    for path, name in videos.items():
+        if name in owners:
+            raise ValueError(f"{owners[name]} and {path} would both be written as {name!r}; "
+                             f"pass their directory instead")
+        owners[name] = path
+    return sorted(videos.items(), key=lambda item: item[1])
+
+
+def _settings_digest(settings: dict) -> str:
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _fingerprint(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _write_atomic(path: str, write) -> None:
+    """Runs ``write(binary file)`` into a temp file, then renames it to ``path``"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        # Atomic, so an interrupted run never leaves a truncated output behind
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class Manifest:
+    """Record of finished videos in an output directory
+
+    Each entry holds the source's size and mtime, a digest of the
+    extraction settings and the outputs written. The file is rewritten
+    atomically after every video, so at most the videos in flight are
+    lost to an interruption.
+    """
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.videos = {}
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.videos = data.get("videos", {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            print(f"Ignoring unreadable manifest {self.path}", file=sys.stderr)
+
+    def up_to_date(self, path: str, name: str, settings: str, outputs: Dict[str, str]) -> bool:
+        entry = self.videos.get(name)
+        if entry is None or entry.get("settings") != settings:
+            return False
+        try:
+            if entry.get("source") != _fingerprint(path):
+                return False
+        except OSError:
+            return False
+        output_dir = os.path.dirname(self.path)
+        return all(entry.get("outputs", {}).get(fmt) == output
+                   and os.path.exists(os.path.join(output_dir, output))
+                   for fmt, output in outputs.items())
+
+    def record(self, name: str, entry: dict) -> None:
+        self.videos[name] = entry
+        _write_atomic(self.path, lambda f: f.write(
+            json.dumps({"version": MANIFEST_VERSION, "videos": self.videos}, indent=1).encode("utf-8")))
+
+
+def convert_video(path: str, output_dir: str, outputs: Dict[str, str], options: dict,
+                  cache_dir: Optional[str] = None) -> dict:
+    """Worker entry point: extracts one video and writes every output
+
+    Returns the source frame count and duration and the time taken, for
+    the throughput summary. If any output fails, the ones already written
+    are removed: the manifest has no entry for a half-converted video.
+    """
+    started = time.perf_counter()
+    options = dict(options)
+    smoothing = options.pop("smoothing", None)
+    cache = ResultCache(cache_dir) if cache_dir else None
+    joint_data = process_video(path, cache=cache, **options)
+    joint_data = smooth_dataframe(joint_data, smoothing)
+
+    written = []
+    try:
+        for fmt, output in outputs.items():
+            writer = BATCH_FORMATS[fmt][0]
+            path_out = os.path.join(output_dir, output)
+            _write_atomic(path_out, lambda f: writer(joint_data, f))
+            written.append(path_out)
+    except BaseException:
+        for path_out in written:
+            try:
+                os.remove(path_out)
+            except FileNotFoundError:
+                pass
+        raise
+
+    frames, fps, _, _ = _video_info(path)
+    return {
+        "frames": frames,
+        "duration": frames / fps if fps else 0.0,
+        "rows": len(joint_data),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def print_summary(done: List[dict], skipped: int, failed: int, wall: float) -> None:
+    """Aggregate throughput over every video converted in this run"""
+    frames = sum(result["frames"] for result in done)
+    duration = sum(result["duration"] for result in done)
+    busy = sum(result["seconds"] for result in done)
+    print(f"\n{len(done)} converted, {skipped} up to date, {failed} failed in {wall:.1f} s")
+    if done and wall > 0:
+        print(f"  {frames} frames at {frames / wall:.1f} frames/s "
+              f"({duration / wall:.2f}x real time, {len(done) / wall * 3600:.0f} videos/hour)")
+        print(f"  {busy / len(done):.1f} s per video on average, "
+              f"{busy / wall:.1f} workers busy on average")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="motion2code", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("inputs", nargs="+", help="video files, glob patterns or directories")
+    parser.add_argument("-o", "--output-dir", default="motion2code_output")
+    parser.add_argument("-f", "--formats", nargs="+", choices=list(BATCH_FORMATS), default=["csv"])
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_JOBS, help="worker processes")
+    parser.add_argument("--mode", choices=MODES, default="human")
+    parser.add_argument("--joints", nargs="+", help="landmark names to keep (default all)")
+    parser.add_argument("--stride", type=int, default=1, help="process every n-th frame")
+    parser.add_argument("--target-fps", type=float, help="subsample to about this many frames/s")
+    parser.add_argument("--max-dimension", type=int, default=DEFAULT_MAX_DIMENSION,
+                        help="downscale frames to this longest side before inference (0 = off)")
+    parser.add_argument("--tracker-tier", choices=list(TRACKER_TIERS), default=DEFAULT_TRACKER_TIER,
+                        help="object mode tracker speed tier")
+    parser.add_argument("--smoothing", choices=["none"] + list(SMOOTHING_METHODS), default="one_euro")
+    parser.add_argument("--cache-dir", help="share extraction results through a ResultCache here")
+    parser.add_argument("--force", action="store_true", help="reconvert even if outputs are up to date")
+    args = parser.parse_args(argv)
+
+    try:
+        videos = expand_inputs(args.inputs)
+    except (FileNotFoundError, ValueError) as e:
+        parser.error(str(e))
+    if not videos:
+        parser.error("no videos found")
+
+    options = {
+        "mode": args.mode,
+        "joints_to_track": args.joints,
+        "stride": args.stride,
+        "target_fps": args.target_fps,
+        "max_dimension": args.max_dimension or None,
+        "smoothing": None if args.smoothing == "none" else args.smoothing,
+    }
+    if args.mode == "object":
+        options["tracker_tier"] = args.tracker_tier
+    settings = _settings_digest(options)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest = Manifest(args.output_dir)
+    pending = []
+    for path, name in videos:
+        outputs = {fmt: f"{name}.{BATCH_FORMATS[fmt][1]}" for fmt in args.formats}
+        if args.force or not manifest.up_to_date(path, name, settings, outputs):
+            pending.append((path, name, outputs))
+    skipped = len(videos) - len(pending)
+    print(f"{len(videos)} videos: {len(pending)} to convert, {skipped} up to date")
+
+    done, failed = [], 0
+    started = time.perf_counter()
+    if pending:
+        # spawn, not fork: MediaPipe does not survive being forked
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(pending))),
+                                       mp_context=context)
+        try:
+            futures = {}
+            for path, name, outputs in pending:
+                source = _fingerprint(path)  # before reading, so edits mid-run force a redo
+                future = executor.submit(convert_video, path, args.output_dir, outputs,
+                                         options, args.cache_dir)
+                futures[future] = (path, name, outputs, source)
+            for future in as_completed(futures):
+                path, name, outputs, source = futures[future]
+                count = f"[{len(done) + failed + 1}/{len(pending)}]"
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"{count} {name}: failed: {e}", file=sys.stderr)
+                    continue
+                manifest.record(name, {"source": source, "settings": settings, "outputs": outputs,
+                                       "frames": result["frames"], "seconds": round(result["seconds"], 3)})
+                done.append(result)
+                rate = result["frames"] / result["seconds"] if result["seconds"] else 0.0
+                print(f"{count} {name}: {result['frames']} frames in {result['seconds']:.1f} s "
+                      f"({rate:.1f} frames/s)")
+        except KeyboardInterrupt:
+            executor.shutdown(wait=False, cancel_futures=True)
+            print("\nInterrupted; finished videos are recorded, re-run to resume", file=sys.stderr)
+            print_summary(done, skipped, failed, time.perf_counter() - started)
+            return 130
+        executor.shutdown()
+
+    print_summary(done, skipped, failed, time.perf_counter() - started)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
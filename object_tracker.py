@@ -1,103 +1,184 @@
+import time
+from typing import Optional
+
 import cv2
 import numpy as np
 
-
+# Pyramidal Lucas-Kanade settings; 3 levels cover fast-moving objects at
+# working resolution
+LK_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01))
 
 
 class ObjectTracker:
-    def __init__(self):
+    """Sparse KLT tracker that follows one object's features between frames
+
+    Features are detected once with ``goodFeaturesToTrack`` and carried
+    forward with ``calcOpticalFlowPyrLK``. Detection only runs again when
+    fewer than ``min_points`` survive, and then only around the object's
+    last known region (or the initial ``bbox``). Point buffers are
+    allocated once for ``max_corners`` points.
+
+    ``stats`` reports per-frame cost and the number of re-seeds;
+    ``detect_every_frame`` re-detects on every frame instead, to measure
+    what the persistent features save.
+    """
+
+    def __init__(self,
+                 max_corners: int = 100,
+                 min_points: Optional[int] = None,
+                 quality_level: float = 0.3,
+                 min_distance: float = 7,
+                 bbox=None,
+                 detect_every_frame: bool = False,
+                 fallback_mode: bool = False,
+                 max_width: int = 1280):
         """Optimized for Ethiopian hardware"""
-        self.prev_points = None
-        self.prev_frame = None
+        self.max_corners = max_corners
+        self.min_points = min_points if min_points is not None else max(8, max_corners // 4)
+        self.quality_level = quality_level
+        self.min_distance = min_distance
+        self.detect_every_frame = detect_every_frame
+        self.fallback_mode = fallback_mode  # For low-end PCs
+        self.max_width = max_width
+
+        # Contrast enhancement for Ethiopian power fluctuations
+        self._clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        self._points = np.empty((max_corners, 1, 2), dtype=np.float32)
+        self._next = np.empty((max_corners, 1, 2), dtype=np.float32)
+        self._status = np.empty((max_corners, 1), dtype=np.uint8)
+        self._err = np.empty((max_corners, 1), dtype=np.float32)
+        self._count = 0
+        self._mask = None
+        self._prev_gray = None
+        self._region = tuple(int(v) for v in bbox) if bbox is not None else None
+        self._scale = 1.0
+
+        self.rotation = 0.0  # degrees, accumulated from frame-to-frame similarity fits
         self.last_position = None
-        self.fallback_mode = False  # For low-end PCs
+        self.frames = 0
+        self.reseeds = 0
+        self._seconds = 0.0
+
+    @property
+    def points(self) -> np.ndarray:
+        """Currently tracked points, shape (n, 2), in working-resolution pixels"""
+        return self._points[:self._count, 0]
 
     def track(self, frame):
+        start = time.perf_counter()
         try:
-            # Adaptive resolution for Ethiopian internet
-            if frame.shape[1] > 1280:  # If HD
-                frame = cv2.resize(frame, (640, 360))
+            return self._track(frame)
+        except cv2.error as e:
+            print(f"Tracking error: {str(e)}")
+            return {'x': 0, 'y': 0, 'rotation': 0, 'speed': 0}
+        finally:
+            self.frames += 1
+            self._seconds += time.perf_counter() - start
 
-            gray = self._preprocess_frame(frame)
+    def _track(self, frame):
+        # Adaptive resolution for Ethiopian internet
+        if self.max_width and frame.shape[1] > self.max_width:
+            if self._prev_gray is None:
+                self._scale = frame.shape[1] / 640
+                if self._region is not None:
+                    self._region = tuple(int(v / self._scale) for v in self._region)
+            frame = cv2.resize(frame, (640, round(frame.shape[0] / self._scale)),
+                               interpolation=cv2.INTER_AREA)
 
-            if self.fallback_mode or cv2.ocl.haveOpenCL() == False:
-                return self._cpu_track(gray)
+        gray = self._preprocess_frame(frame)
 
-            return self._gpu_track(gray)
+        if self.fallback_mode:
+            x, y = self._contour_center(gray)
+        else:
+            if self._prev_gray is None:
+                self._seed(gray)
+            else:
+                if self.detect_every_frame or self._count < self.min_points:
+                    # Seeded on the previous frame so this frame's flow still applies
+                    self._seed(self._prev_gray)
+                self._flow(gray)
+            if self._count:
+                x, y = self.points.mean(axis=0)
+            else:
+                # Nothing left to follow; hold the last known position
+                x, y = (v / self._scale for v in (self.last_position or (0.0, 0.0)))
+        self._prev_gray = gray
 
-        except Exception as e:
-            print(f"Tracking error: {str(e)}")
-            return {'x': 0, 'y': 0, 'rotation': 0, 'speed': 0}
+        x, y = float(x) * self._scale, float(y) * self._scale
+        return {
+            'x': x,
+            'y': y,
+            'rotation': self.rotation,
+            'speed': self._calculate_speed(x, y),
+        }
 
     def _preprocess_frame(self, frame):
         """Handle low-light Ethiopian videos"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return self._clahe.apply(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY))
 
-        # Contrast enhancement for Ethiopian power fluctuations
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        return clahe.apply(gray)
-
-    def _gpu_track(self, gray):
-        """GPU-accelerated tracking"""
-        features = cv2.goodFeaturesToTrack(
-            gray,
-            maxCorners=50,  # Reduced for Ethiopian GPUs
-            qualityLevel=0.2,
-            minDistance=5
-        )
+    def _seed(self, gray) -> None:
+        """Detects a fresh feature set inside the object's region"""
+        mask = None
+        if self._region is not None:
+            if self._mask is None or self._mask.shape != gray.shape:
+                self._mask = np.zeros(gray.shape, dtype=np.uint8)
+            x, y, w, h = self._region
+            self._mask[y:y + h, x:x + w] = 255
+            mask = self._mask
 
-class ObjectTracker:
-    def __init__(self):
-        self.prev_points = None
-        self.rotation_history = []
+        corners = cv2.goodFeaturesToTrack(gray, self.max_corners, self.quality_level,
+                                          self.min_distance, mask=mask)
+        if mask is not None:
+            mask[y:y + h, x:x + w] = 0
 
-    def track(self, frame):
-        # Convert to grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        # Detect features to track (good for cars/objects)
-        features = cv2.goodFeaturesToTrack(gray, maxCorners=100, qualityLevel=0.3, minDistance=7)
-
-        if features is not None:
-            # Calculate optical flow (movement between frames)
-            new_features, status, _ = cv2.calcOpticalFlowPyrLK(
-                self.prev_frame if self.prev_points is not None else gray,
-                gray,
-                self.prev_points,
-                None
-            )
-
-            # Calculate center point and rotation
-            center_x = np.mean(new_features[:, 0])
-            center_y = np.mean(new_features[:, 1])
-            rotation = self._calculate_rotation(new_features)
-
-            # Store for next frame
-            self.prev_points = new_features
-            self.prev_frame = gray
-
-            return {
-                'x': float(center_x),
-                'y': float(center_y),
-                'rotation': float(rotation),
-                'speed': self._calculate_speed(center_x, center_y)
-            }
-        return {'x': 0, 'y': 0, 'rotation': 0, 'speed': 0}
-
-    def _calculate_rotation(self, points):
-        # Simplified rotation calculation
-        return np.std(points[:, 0])  # Higher value = more rotation
+        count = 0 if corners is None else len(corners)
+        if count:
+            self._points[:count] = corners
+        self._count = count
+        self.reseeds += 1
+
+    def _flow(self, gray) -> None:
+        """Advances the tracked points to ``gray`` and drops the lost ones"""
+        n = self._count
+        if n == 0:
+            return
+        prev, nxt = self._points[:n], self._next[:n]
+        cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, prev, nxt,
+                                 self._status[:n], self._err[:n], **LK_PARAMS)
+        keep = self._status[:n, 0] == 1
+        survivors = nxt[keep]
+
+        if len(survivors) >= 2:
+            transform, _ = cv2.estimateAffinePartial2D(prev[keep], survivors)
+            if transform is not None:
+                self.rotation += float(np.degrees(np.arctan2(transform[1, 0], transform[0, 0])))
+
+        self._count = len(survivors)
+        self._points[:self._count] = survivors
+        if self._count:
+            self._region = self._padded_region(cv2.boundingRect(survivors), gray.shape)
+
+    @staticmethod
+    def _padded_region(rect, shape, pad: float = 0.5):
+        """``rect`` grown by ``pad`` of its size on each side, clipped to the frame"""
+        x, y, w, h = rect
+        dx, dy = int(w * pad) + 8, int(h * pad) + 8
+        x0, y0 = max(x - dx, 0), max(y - dy, 0)
+        x1, y1 = min(x + w + dx, shape[1]), min(y + h + dy, shape[0])
+        return x0, y0, x1 - x0, y1 - y0
 
     def _calculate_speed(self, x, y):
-        if not hasattr(self, 'last_position'):
+        """Pixels moved since the previous frame"""
+        if self.last_position is None:
             self.last_position = (x, y)
-            return 0
+            return 0.0
         dx = x - self.last_position[0]
         dy = y - self.last_position[1]
         self.last_position = (x, y)
-        return np.sqrt(dx ** 2 + dy ** 2)
+        return float(np.hypot(dx, dy))
 
-    def _cpu_track(self, gray):
+    def _contour_center(self, gray):
         """Fallback for low-end Ethiopian PCs"""
         # Simplified tracking algorithm
         edges = cv2.Canny(gray, 100, 200)
@@ -106,5 +187,230 @@ class ObjectTracker:
         if contours:
             largest = max(contours, key=cv2.contourArea)
             (x, y), _ = cv2.minEnclosingCircle(largest)
-            return {'x': x, 'y': y, 'rotation': 0, 'speed': 0}
-        return {'x': 0, 'y': 0, 'rotation': 0, 'speed': 0}
+            return x, y
+        return 0.0, 0.0
+
+    def stats(self) -> dict:
+        return {
+            'frames': self.frames,
+            'reseeds': self.reseeds,
+            'points': self._count,
+            'ms_per_frame': 1000 * self._seconds / self.frames if self.frames else None,
+            'fps': self.frames / self._seconds if self._seconds else None,
+        }
+
+
+DEFAULT_TRACKER_TIER = "balanced"
+DEFAULT_INIT_FRAMES = 30
+
+# tier -> tracker names tried in order; "KLT" is ObjectTracker, the rest
+# are OpenCV trackers. KCF and CSRT come from opencv-contrib (pinned in
+# requirements.txt); MIL, in every build, only stands in where it's missing.
+TRACKER_TIERS = {
+    "fast": ("KLT",),
+    "balanced": ("KCF", "MIL"),
+    "accurate": ("CSRT", "MIL"),
+}
+
+
+class KLTBoxTracker:
+    """OpenCV-style ``init``/``update`` wrapper around ``ObjectTracker``
+
+    The box keeps its initial size and moves with the tracked features.
+    """
+
+    def __init__(self, **tracker_kwargs):
+        # Frames arrive at working resolution already
+        self.tracker_kwargs = dict(max_width=0)
+        self.tracker_kwargs.update(tracker_kwargs)
+        self.tracker = None
+        self._offset = (0.0, 0.0)
+        self._size = (0, 0)
+
+    def init(self, frame, bbox) -> None:
+        x, y, w, h = bbox
+        self.tracker = ObjectTracker(bbox=bbox, **self.tracker_kwargs)
+        center = self.tracker.track(frame)
+        self._offset = (x - center['x'], y - center['y'])
+        self._size = (w, h)
+
+    def update(self, frame):
+        center = self.tracker.track(frame)
+        x, y = center['x'] + self._offset[0], center['y'] + self._offset[1]
+        return len(self.tracker.points) > 0, (x, y) + self._size
+
+
+def _opencv_tracker_factory(name: str):
+    """``cv2.Tracker<name>_create`` from the main or legacy namespace, if built"""
+    for namespace in (cv2, getattr(cv2, "legacy", None)):
+        factory = getattr(namespace, f"Tracker{name}_create", None)
+        if factory is not None:
+            return factory
+    return None
+
+
+def create_tracker(tier: str = DEFAULT_TRACKER_TIER):
+    """Cheapest available tracker for a speed tier (see TRACKER_TIERS)"""
+    if tier not in TRACKER_TIERS:
+        raise ValueError(f"Unknown tracker tier {tier!r}; choose from {', '.join(TRACKER_TIERS)}")
+    for name in TRACKER_TIERS[tier]:
+        if name == "KLT":
+            return KLTBoxTracker()
+        factory = _opencv_tracker_factory(name)
+        if factory is not None:
+            return factory()
+    raise RuntimeError(f"No tracker for the {tier!r} tier in this OpenCV build "
+                       f"(tried {', '.join(TRACKER_TIERS[tier])}); install opencv-contrib-python")
+
+
+class MotionDetector:
+    """Moving-object boxes from MOG2 background subtraction
+
+    ``detect`` returns an (n, 4) array of (x, y, w, h) boxes for the
+    foreground blobs covering at least ``min_area`` of the frame. The
+    first ``warmup`` frames only train the background model.
+    """
+
+    def __init__(self, history: int = 120, warmup: int = 5, min_area: float = 0.002):
+        self.warmup = warmup
+        self.min_area = min_area
+        self._subtractor = cv2.createBackgroundSubtractorMOG2(history=history, detectShadows=False)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self._seen = 0
+
+    def detect(self, frame) -> np.ndarray:
+        foreground = self._subtractor.apply(frame)
+        self._seen += 1
+        if self._seen <= self.warmup:
+            return np.empty((0, 4), dtype=np.float32)
+        foreground = cv2.morphologyEx(foreground, cv2.MORPH_OPEN, self._kernel)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(foreground)
+        stats = stats[1:]  # label 0 is the background
+        large = stats[:, cv2.CC_STAT_AREA] >= self.min_area * frame.shape[0] * frame.shape[1]
+        return stats[large, :4].astype(np.float32)
+
+
+def detect_moving_object(frames, max_frames: int = DEFAULT_INIT_FRAMES,
+                         warmup: int = 5, min_area: float = 0.002):
+    """Finds the object to track from motion, with no GUI involved
+
+    Feeds up to ``max_frames`` (index, frame) pairs through a
+    ``MotionDetector`` and stops at the first frame after ``warmup`` with
+    a large enough foreground blob. Returns (index, frame, bbox) with the
+    biggest blob's box for that frame, or None.
+    """
+    detector = MotionDetector(history=max_frames, warmup=warmup, min_area=min_area)
+    for seen, (index, frame) in enumerate(frames, 1):
+        boxes = detector.detect(frame)
+        if len(boxes):
+            x, y, w, h = boxes[np.argmax(boxes[:, 2] * boxes[:, 3])]
+            return index, frame, (int(x), int(y), int(w), int(h))
+        if seen >= max_frames:
+            break
+    return None
+
+
+def _box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (n, 4) and (m, 4) center-size boxes, shape (n, m)"""
+    a_min, a_max = a[:, None, :2] - a[:, None, 2:] / 2, a[:, None, :2] + a[:, None, 2:] / 2
+    b_min, b_max = b[None, :, :2] - b[None, :, 2:] / 2, b[None, :, :2] + b[None, :, 2:] / 2
+    overlap = np.clip(np.minimum(a_max, b_max) - np.maximum(a_min, b_min), 0, None).prod(axis=2)
+    union = a[:, None, 2:].prod(axis=2) + b[None, :, 2:].prod(axis=2) - overlap
+    return overlap / np.maximum(union, 1e-9)
+
+
+def _greedy_assign(scores: np.ndarray, threshold: float):
+    """Highest-score-first one-to-one matching; returns (rows, cols) arrays"""
+    rows, cols = np.nonzero(scores >= threshold)
+    order = np.argsort(-scores[rows, cols], kind="stable")
+    row_used = np.zeros(scores.shape[0], dtype=bool)
+    col_used = np.zeros(scores.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+    for r, c in zip(rows[order], cols[order]):
+        if not row_used[r] and not col_used[c]:
+            row_used[r] = col_used[c] = True
+            matched_rows.append(r)
+            matched_cols.append(c)
+    return np.array(matched_rows, dtype=np.intp), np.array(matched_cols, dtype=np.intp)
+
+
+class MultiObjectTracker:
+    """Tracks many objects with one batched constant-velocity Kalman filter
+
+    Every track's state (cx, cy, w, h and their velocities) lives in a
+    single (n, 8) array with (n, 8, 8) covariances, so prediction and
+    correction are one einsum each regardless of the object count.
+    Detections are matched to predicted boxes once per frame by greedy
+    IoU assignment. Tracks are reported once they've been matched
+    ``min_hits`` times and dropped after ``max_misses`` unmatched frames.
+    """
+
+    # x' = F x: positions advance by one frame of velocity
+    F = np.eye(8, dtype=np.float64)
+    F[:4, 4:] = np.eye(4)
+    H = np.eye(4, 8, dtype=np.float64)  # boxes observe the first four states
+    Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001, 0.0001])
+    R = np.diag([1.0, 1.0, 10.0, 10.0])
+    P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4, 1e4])
+
+    def __init__(self, iou_threshold: float = 0.2, min_hits: int = 3,
+                 max_misses: int = 10, max_tracks: int = 64):
+        self.iou_threshold = iou_threshold
+        self.min_hits = min_hits
+        self.max_misses = max_misses
+        self.max_tracks = max_tracks
+        self._x = np.empty((0, 8))
+        self._P = np.empty((0, 8, 8))
+        self._ids = np.empty(0, dtype=np.int64)
+        self._hits = np.empty(0, dtype=np.int64)
+        self._misses = np.empty(0, dtype=np.int64)
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _predict(self) -> None:
+        self._x = self._x @ self.F.T
+        self._P = np.einsum('ij,njk,lk->nil', self.F, self._P, self.F) + self.Q
+        self._x[:, 2:4] = np.maximum(self._x[:, 2:4], 1.0)
+
+    def _correct(self, tracks: np.ndarray, boxes: np.ndarray) -> None:
+        x, P = self._x[tracks], self._P[tracks]
+        residual = boxes - x[:, :4]
+        S = P[:, :4, :4] + self.R  # H P H^T + R, with H selecting the first four states
+        gain = np.linalg.solve(S, P[:, :4, :]).transpose(0, 2, 1)  # P H^T S^-1 (S symmetric)
+        self._x[tracks] = x + np.einsum('nij,nj->ni', gain, residual)
+        self._P[tracks] = P - np.einsum('nij,njk->nik', gain, P[:, :4, :])
+
+    def update(self, detections: np.ndarray) -> np.ndarray:
+        """Advances one frame with (m, 4) (x, y, w, h) detections
+
+        Returns (object_id, cx, cy, w, h) rows for the confirmed tracks
+        matched in this frame.
+        """
+        boxes = np.asarray(detections, dtype=np.float64).reshape(-1, 4)
+        boxes = np.hstack([boxes[:, :2] + boxes[:, 2:] / 2, boxes[:, 2:]])
+
+        self._predict()
+        tracks, matched = _greedy_assign(_box_iou(self._x[:, :4], boxes), self.iou_threshold)
+        if len(tracks):
+            self._correct(tracks, boxes[matched])
+        self._hits[tracks] += 1
+        self._misses += 1
+        self._misses[tracks] = 0
+
+        keep = self._misses <= self.max_misses
+        reported = keep & (self._misses == 0) & (self._hits >= self.min_hits)
+        rows = np.column_stack([self._ids[reported], self._x[reported, :4]])
+
+        unmatched = np.ones(len(boxes), dtype=bool)
+        unmatched[matched] = False
+        new = boxes[unmatched][:max(self.max_tracks - int(keep.sum()), 0)]
+        velocity = np.zeros((len(new), 4))
+        self._x = np.vstack([self._x[keep], np.hstack([new, velocity])])
+        self._P = np.concatenate([self._P[keep], np.broadcast_to(self.P0, (len(new), 8, 8))])
+        self._ids = np.concatenate([self._ids[keep], np.arange(self._next_id, self._next_id + len(new))])
+        self._hits = np.concatenate([self._hits[keep], np.ones(len(new), dtype=np.int64)])
+        self._misses = np.concatenate([self._misses[keep], np.zeros(len(new), dtype=np.int64)])
+        self._next_id += len(new)
+        return rows
@@ -1,22 +1,130 @@
+import multiprocessing
 import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import cv2
 import mediapipe as mp
 import pandas as pd
 import numpy as np
-from typing import Optional, List
+from typing import Callable, Dict, Iterable, Iterator, Optional, List, Sequence, Tuple
+
+# Re-exported: the export formats are part of this module's API
+from exporters import (export_csv, export_feather, export_npz, export_parquet,  # noqa: F401
+                       export_raw, read_raw)
+from object_tracker import (DEFAULT_INIT_FRAMES, DEFAULT_TRACKER_TIER, TRACKER_TIERS,
+                            MotionDetector, MultiObjectTracker, create_tracker,
+                            detect_moving_object)
+from pose_pool import PosePool, get_default_pool
+from result_cache import ResultCache
+from timeseries import interpolate_rows
+from video_source import VideoSource, is_path, open_video_source, video_buffer
 
-# Initialize MediaPipe Pose
 mp_pose = mp.solutions.pose
-pose = mp_pose.Pose(static_image_mode=False,
-                    min_detection_confidence=0.5,
-                    min_tracking_confidence=0.5)
-
 
-def enhance_video_quality(video_path: str) -> str:
-    """Enhanced video processing with Ethiopian servo calibration"""
+NUM_LANDMARKS = 33  # MediaPipe's 33 pose landmarks
+
+# Ethiopian servo calibration (1.07, 1.05, 1.03 factors preserved)
+CALIBRATION_SCALE = np.array([1.07, 1.05, 1.03], dtype=np.float32)
+CALIBRATION_OFFSET = np.array([-0.03, -0.02, 0.0], dtype=np.float32)
+
+# Frames are downscaled to this longest side right after decode. MediaPipe
+# resizes to its own small input anyway, so extra pixels only cost time.
+DEFAULT_MAX_DIMENSION = 1280
+
+# progress(frames_done, total_frames, stage)
+ProgressCallback = Callable[[int, int, str], None]
+
+
+class FrameEnhancer:
+    """Reusable contrast + sharpening stage with exposure gating
+
+    The CLAHE object and sharpening kernel are built once. With ``gate``
+    on, a frame is only enhanced when a cheap luminance estimate says it
+    is too dark, too bright or too flat; ``enhanced`` and ``skipped``
+    count the decisions.
+
+    With ``per_clip`` the gate is decided on the first frame of a clip
+    (see ``begin_clip``) and held, so enhancement never toggles between
+    neighbouring frames. Background subtraction and box trackers would
+    otherwise read each toggle as motion.
+    """
+
+    def __init__(self,
+                 gate: bool = True,
+                 dark_below: float = 70.0,
+                 bright_above: float = 190.0,
+                 min_contrast: float = 40.0,
+                 per_clip: bool = False):
+        self.gate = gate
+        self.dark_below = dark_below
+        self.bright_above = bright_above
+        self.min_contrast = min_contrast
+        self.per_clip = per_clip
+        self._clip_decision = None
+        # Contrast enhancement for diverse lighting (optimized for African skin tones)
+        self._clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        # Sharpening for clearer joint detection
+        self._kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype=np.float32)
+        self.enhanced = 0
+        self.skipped = 0
+
+    def needs_enhancement(self, frame: np.ndarray) -> bool:
+        """Luminance mean/spread of an 8x subsampled grey frame"""
+        grey = cv2.cvtColor(frame[::8, ::8], cv2.COLOR_BGR2GRAY)
+        mean, std = cv2.meanStdDev(grey)
+        mean, std = float(mean[0, 0]), float(std[0, 0])
+        return mean < self.dark_below or mean > self.bright_above or std < self.min_contrast
+
+    def settings(self) -> dict:
+        """Constructor arguments, to rebuild an equivalent enhancer elsewhere"""
+        return dict(gate=self.gate, dark_below=self.dark_below, bright_above=self.bright_above,
+                    min_contrast=self.min_contrast, per_clip=self.per_clip)
+
+    def begin_clip(self) -> None:
+        """Forgets the held per-clip decision before a new clip"""
+        self._clip_decision = None
+
+    def _wants(self, frame: np.ndarray) -> bool:
+        if not self.gate:
+            return True
+        if not self.per_clip:
+            return self.needs_enhancement(frame)
+        if self._clip_decision is None:
+            self._clip_decision = self.needs_enhancement(frame)
+        return self._clip_decision
+
+    def __call__(self, frame: np.ndarray, rgb: bool = False) -> np.ndarray:
+        """Enhances a BGR frame, returning BGR or (``rgb``) RGB"""
+        if not self._wants(frame):
+            self.skipped += 1
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if rgb else frame
+
+        self.enhanced += 1
+        lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+        cv2.insertChannel(self._clahe.apply(cv2.extractChannel(lab, 0)), lab, 0)
+        frame = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB if rgb else cv2.COLOR_LAB2BGR)
+        return cv2.filter2D(frame, -1, self._kernel)
+
+    def stats(self) -> dict:
+        return {'enhanced': self.enhanced, 'skipped': self.skipped}
+
+
+def enhance_video_quality(video_path: str,
+                          enhanced_path: Optional[str] = None,
+                          progress: Optional[Callable[[int], None]] = None) -> str:
+    """Writes an enhanced copy of the video to disk (debug path only)
+
+    Without ``enhanced_path`` a uniquely named temp file is created; the
+    caller owns it either way.
+    """
+    if enhanced_path is None:
+        fd, enhanced_path = tempfile.mkstemp(prefix="enhanced_", suffix=".mp4")
+        os.close(fd)
     cap = cv2.VideoCapture(video_path)
     fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-    enhanced_path = "enhanced_temp.mp4"
 
     # Get video properties
     fps = int(cap.get(cv2.CAP_PROP_FPS))
@@ -25,126 +133,680 @@ def enhance_video_quality(video_path: str) -> str:
 
     out = cv2.VideoWriter(enhanced_path, fourcc, fps, (width, height))
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        # Enhancement pipeline (optimized for African skin tones)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        # Contrast enhancement for diverse lighting
-        lab = cv2.cvtColor(frame, cv2.COLOR_RGB2LAB)
-        l, a, b = cv2.split(lab)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        limg = cv2.merge([clahe.apply(l), a, b])
-        frame = cv2.cvtColor(limg, cv2.COLOR_LAB2RGB)
-
-        # Sharpening for clearer joint detection
-        kernel = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
-        frame = cv2.filter2D(frame, -1, kernel)
-
-        out.write(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    enhancer = FrameEnhancer(gate=False)
+    for done, (_, frame) in enumerate(_read_frames(cap), 1):
+        out.write(enhancer(frame))
+        if progress is not None:
+            progress(done)
 
     cap.release()
     out.release()
     return enhanced_path
 
 
-def process_video(video_path: str,
+def _read_frames(cap: cv2.VideoCapture,
+                 start: int = 0,
+                 stop: Optional[int] = None,
+                 sampler: Optional["FrameSampler"] = None,
+                 timestamps: Optional[Dict[int, float]] = None) -> Iterator[Tuple[int, np.ndarray]]:
+    """Decodes frames one at a time as (frame index, frame)
+
+    Frames the ``sampler`` doesn't want are only grabbed, not retrieved.
+    Every frame's ``CAP_PROP_POS_MSEC``, skipped or not, is recorded in
+    ``timestamps`` under its index.
+    """
+    index = start
+    while cap.isOpened() and (stop is None or index < stop):
+        if sampler is not None and not sampler.want(index):
+            if not cap.grab():
+                break
+            if timestamps is not None:
+                timestamps[index] = cap.get(cv2.CAP_PROP_POS_MSEC)
+        else:
+            success, frame = cap.read()
+            if not success:
+                break
+            if timestamps is not None:
+                timestamps[index] = cap.get(cv2.CAP_PROP_POS_MSEC)
+            yield index, frame
+        index += 1
+
+
+class FrameSampler:
+    """Decides which frames get pose inference
+
+    A fixed ``stride`` runs inference on every n-th frame. In adaptive
+    mode the stride halves when joints move faster than ``fast_motion``
+    and doubles when they move slower than ``slow_motion`` (normalized
+    image units per frame), staying within [min_stride, max_stride].
+    """
+
+    def __init__(self,
+                 stride: int = 1,
+                 adaptive: bool = False,
+                 min_stride: int = 1,
+                 max_stride: Optional[int] = None,
+                 fast_motion: float = 0.01,
+                 slow_motion: float = 0.002):
+        self.stride = max(int(stride), 1)
+        self.adaptive = adaptive
+        self.min_stride = max(int(min_stride), 1)
+        self.max_stride = max_stride or 4 * self.stride
+        self.fast_motion = fast_motion
+        self.slow_motion = slow_motion
+        self._next = 0
+        self._last_index = None
+        self._last_xy = None
+
+    def want(self, index: int) -> bool:
+        return index >= self._next
+
+    def observe(self, index: int, landmarks: Optional[np.ndarray]) -> None:
+        """Feeds back the raw (33, 4) landmarks of a sampled frame, if any"""
+        if self.adaptive and landmarks is not None:
+            visible = landmarks[:, 3] > 0.5
+            xy = landmarks[:, :2]
+            if self._last_xy is not None and visible.any():
+                elapsed = index - self._last_index
+                speed = np.abs(xy[visible] - self._last_xy[visible]).max(axis=1).mean() / elapsed
+                if speed > self.fast_motion:
+                    self.stride = max(self.min_stride, self.stride // 2)
+                elif speed < self.slow_motion:
+                    self.stride = min(self.max_stride, self.stride * 2)
+            self._last_index, self._last_xy = index, xy.copy()
+        self._next = index + self.stride
+
+
+def _working_size(width: int, height: int,
+                  max_dimension: Optional[int]) -> Optional[Tuple[int, int]]:
+    """(width, height) to downscale to, or None to keep the source size"""
+    if not max_dimension or max(width, height) <= max_dimension:
+        return None
+    scale = max_dimension / max(width, height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _downscaled_frames(frames: Iterable[Tuple[int, np.ndarray]],
+                       size: Optional[Tuple[int, int]]) -> Iterator[Tuple[int, np.ndarray]]:
+    """Resizes decoded frames to the working resolution"""
+    if size is None:
+        yield from frames
+        return
+    for index, frame in frames:
+        yield index, cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def _enhanced_frames(frames: Iterable[Tuple[int, np.ndarray]],
+                     enhancer: FrameEnhancer,
+                     rgb: bool = False) -> Iterator[Tuple[int, np.ndarray]]:
+    """Streams frames through the enhancement stage in memory"""
+    for index, frame in frames:
+        yield index, enhancer(frame, rgb)
+
+
+def _rgb_frames(frames: Iterable[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, np.ndarray]]:
+    for index, frame in frames:
+        yield index, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+
+def process_video(video_path: VideoSource,
                   mode: str = "human",
-                  joints_to_track: Optional[List[str]] = None) -> pd.DataFrame:
-    """Main processing function with Ethiopian calibration"""
+                  joints_to_track: Optional[List[str]] = None,
+                  debug_enhanced_path: Optional[str] = None,
+                  pose_pool: Optional[PosePool] = None,
+                  workers: int = 1,
+                  warmup_frames: int = 15,
+                  cache: Optional[ResultCache] = None,
+                  progress: Optional[ProgressCallback] = None,
+                  stride: int = 1,
+                  target_fps: Optional[float] = None,
+                  adaptive_stride: bool = False,
+                  interpolate: bool = False,
+                  max_dimension: Optional[int] = DEFAULT_MAX_DIMENSION,
+                  enhancer: Optional[FrameEnhancer] = None,
+                  bbox: Optional[Tuple[int, int, int, int]] = None,
+                  tracker_tier: str = DEFAULT_TRACKER_TIER) -> pd.DataFrame:
+    """Main processing function with Ethiopian calibration
+
+    ``video_path`` may also be the video itself as bytes or a buffer
+    (e.g. a Streamlit upload); it's decoded from memory without touching
+    disk (see ``open_video_source``).
+
+    Frames are decoded, enhanced and fed to inference in a single pass.
+    Passing ``debug_enhanced_path`` restores the old two-pass behaviour:
+    the enhanced video is written there, decoded again and kept on disk
+    for inspection.
+
+    Human mode checks a Pose tracker out of ``pose_pool`` (the shared
+    process-wide pool by default) for the duration of the video, and
+    raises TimeoutError if none frees up within the pool's checkout timeout.
+
+    With ``workers`` > 1, human mode splits the video into frame-index
+    segments that are extracted in separate processes (see
+    ``_process_human_video_parallel``). The returned DataFrame is indexed
+    by source frame number either way.
+
+    If a ``cache`` is given, results are looked up by a hash of the video
+    bytes and the extraction parameters before any decoding happens.
+
+    ``progress`` is called as ``progress(frames_done, total_frames, stage)``
+    where ``total_frames`` comes from ``CAP_PROP_FRAME_COUNT`` (0 if the
+    container doesn't say) and ``stage`` is "enhance" (debug pass only),
+    "extract" or "done".
+
+    Human mode can run inference on a subset of frames: every ``stride``-th
+    frame, or the stride that brings the source down to ``target_fps``.
+    ``adaptive_stride`` then samples densely during fast motion and
+    sparsely while the subject is still (see ``FrameSampler``). With
+    ``interpolate`` the skipped frames are filled in to full rate.
+
+    Frames larger than ``max_dimension`` on their longest side are
+    downscaled right after decode (None disables this). Landmarks are
+    normalized so they're unaffected; object boxes are scaled back to
+    source pixels.
+
+    Enhancement runs through ``enhancer`` (a gated ``FrameEnhancer`` by
+    default, gated once per clip outside human mode); pass your own to
+    read its enhanced/skipped counters. Its settings are carried into
+    parallel segments.
+
+    Object mode starts from ``bbox`` (x, y, w, h in source pixels) or
+    finds the moving object itself, and follows it with the tracker for
+    ``tracker_tier`` ("fast", "balanced" or "accurate"). "multi_object"
+    mode follows every moving object and returns one row per object per
+    frame with an ``object_id`` column.
+    """
+    enhancer = enhancer or FrameEnhancer(per_clip=mode != "human")
+    enhancer.begin_clip()
+    # In-memory uploads are hashed as-is rather than re-read for the cache key
+    key_source = video_path if is_path(video_path) else video_buffer(video_path)
+    with open_video_source(key_source) as video_path:
+        total_frames, source_fps, width, height = _video_info(video_path)
+        size = _working_size(width, height, max_dimension)
+        if target_fps and source_fps > 0:
+            stride = max(1, int(round(source_fps / target_fps)))
+        sampler_options = None
+        if mode == "human" and (stride > 1 or adaptive_stride):
+            sampler_options = dict(stride=stride, adaptive=adaptive_stride)
+
+        cache_key = None
+        if cache is not None:
+            key_params = dict(mode=mode, joints=joints_to_track,
+                              calibration=[CALIBRATION_SCALE.tolist(),
+                                           CALIBRATION_OFFSET.tolist()],
+                              sampler=sampler_options, interpolate=interpolate,
+                              working_size=size, enhancement=enhancer.settings())
+            if mode == "object":
+                key_params.update(bbox=bbox, tracker_tier=tracker_tier)
+            if mode == "human" and workers > 1 and not debug_enhanced_path:
+                # Segment boundaries and their warmup change the tracker's output
+                key_params.update(workers=workers, warmup_frames=warmup_frames)
+            cache_key = cache.make_key(key_source, **key_params)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if progress is not None:
+                    progress(len(cached), len(cached), "done")
+                return cached
+
+        cap = None
+        timestamps = {}
+        try:
+            if mode == "human" and workers > 1 and not debug_enhanced_path:
+                result = _process_human_video_parallel(video_path, joints_to_track, workers,
+                                                       warmup_frames, total_frames, progress,
+                                                       sampler_options, interpolate, size,
+                                                       enhancer, timestamps)
+            else:
+                sampler = FrameSampler(**sampler_options) if sampler_options else None
+                if debug_enhanced_path:
+                    cap = cv2.VideoCapture(enhance_video_quality(
+                        video_path, debug_enhanced_path,
+                        progress=_stage_progress(progress, total_frames, "enhance")))
+                    frames = _downscaled_frames(_read_frames(cap, sampler=sampler,
+                                                             timestamps=timestamps), size)
+                    if mode == "human":
+                        frames = _rgb_frames(frames)
+                else:
+                    cap = cv2.VideoCapture(video_path)
+                    # Human mode gets RGB straight out of the LAB conversion
+                    frames = _enhanced_frames(
+                        _downscaled_frames(_read_frames(cap, sampler=sampler,
+                                                        timestamps=timestamps), size),
+                        enhancer, rgb=mode == "human")
+                frames = _report_progress(frames, total_frames, progress, "extract")
+
+                if mode == "human":
+                    result = _process_human_video(frames, joints_to_track,
+                                                  pose_pool or get_default_pool(),
+                                                  sampler, interpolate, timestamps)
+                else:
+                    scale = (width / size[0], height / size[1]) if size else (1.0, 1.0)
+                    if mode == "multi_object":
+                        result = _process_multi_object_video(frames, scale)
+                    else:
+                        result = _process_object_video(frames, scale, bbox, tracker_tier)
+        except TimeoutError:
+            # Busy pose pool: callers retry on this, so keep its type
+            raise
+        except Exception as e:
+            raise Exception(f"Video processing error: {str(e)}")
+        finally:
+            if cap is not None: cap.release()
+
+        # Exporters use these for timestamps/headers and aspect correction
+        result.attrs["fps"] = source_fps
+        result.attrs["frame_size"] = (width, height)
+        result.attrs["frame_times_ms"] = _frame_times(timestamps)
+        if cache_key is not None:
+            cache.put(cache_key, result)
+        if progress is not None:
+            progress(total_frames, total_frames, "done")
+        return result
+
+
+def _frame_times(timestamps: Dict[int, float]) -> np.ndarray:
+    """Decoder timestamps (ms) indexed by source frame number, NaN where unknown"""
+    times = np.full(max(timestamps, default=-1) + 1, np.nan)
+    if timestamps:
+        times[np.fromiter(timestamps.keys(), dtype=np.intp, count=len(timestamps))] = \
+            np.fromiter(timestamps.values(), dtype=np.float64, count=len(timestamps))
+    return times
+
+
+def _video_info(video_path: str) -> Tuple[int, float, int, int]:
+    """Frame count, fps, width and height from the container (0 when unknown)"""
+    cap = cv2.VideoCapture(video_path)
     try:
-        enhanced_path = enhance_video_quality(video_path)
-        cap = cv2.VideoCapture(enhanced_path)
-
-        if mode == "human":
-            return _process_human_video(cap, joints_to_track)
-        else:
-            return _process_object_video(cap)
-    except Exception as e:
-        raise Exception(f"Video processing error: {str(e)}")
+        return (max(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 0),
+                max(float(cap.get(cv2.CAP_PROP_FPS)), 0.0),
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
     finally:
-        if 'cap' in locals(): cap.release()
-        if os.path.exists(enhanced_path): os.remove(enhanced_path)
-
-
-def _process_human_video(cap: cv2.VideoCapture,
-                         joints_to_track: Optional[List[str]]) -> pd.DataFrame:
-    """Human pose processing with servo calibration factors"""
-    joint_data = []
-    GAME_JOINTS = ["LEFT_SHOULDER", "RIGHT_SHOULDER",
-                   "LEFT_ELBOW", "RIGHT_ELBOW",
-                   "LEFT_HIP", "RIGHT_HIP",
-                   "LEFT_KNEE", "RIGHT_KNEE"]
-
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            break
+        cap.release()
+
+
+def _stage_progress(progress: Optional[ProgressCallback],
+                    total_frames: int,
+                    stage: str) -> Optional[Callable[[int], None]]:
+    """Binds total and stage so a stage only reports frames done"""
+    if progress is None:
+        return None
+    return lambda done: progress(done, total_frames, stage)
+
+
+def _report_progress(frames: Iterable[Tuple[int, np.ndarray]],
+                     total_frames: int,
+                     progress: Optional[ProgressCallback],
+                     stage: str) -> Iterator[Tuple[int, np.ndarray]]:
+    """Passes frames through, reporting each one to the progress callback"""
+    if progress is None:
+        yield from frames
+        return
+    for index, frame in frames:
+        yield index, frame
+        # Frame index, not count, so skipped (strided) frames count as done
+        progress(index + 1, total_frames, stage)
+
+
+class LandmarkBuffer:
+    """Growable float32 store of raw landmarks, shape (frames, 33, 4)
+
+    The last axis is (x, y, z, visibility) exactly as MediaPipe reports
+    them; calibration and joint selection happen once in ``to_dataframe``.
+    """
+
+    def __init__(self, capacity: int = 256):
+        capacity = max(capacity, 1)
+        self._landmarks = np.empty((capacity, NUM_LANDMARKS, 4), dtype=np.float32)
+        self._frames = np.empty(capacity, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, minimum: int) -> None:
+        capacity = max(minimum, 2 * len(self._frames))
+        landmarks = np.empty((capacity, NUM_LANDMARKS, 4), dtype=np.float32)
+        frames = np.empty(capacity, dtype=np.int64)
+        landmarks[:self._size] = self._landmarks[:self._size]
+        frames[:self._size] = self._frames[:self._size]
+        self._landmarks, self._frames = landmarks, frames
+
+    def append(self, frame_index: int, landmarks) -> None:
+        """Copies one frame of MediaPipe landmarks into the buffer"""
+        if self._size == len(self._frames):
+            self._grow(self._size + 1)
+        self._landmarks[self._size] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks]
+        self._frames[self._size] = frame_index
+        self._size += 1
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        return self._landmarks[:self._size]
+
+    @property
+    def frame_indices(self) -> np.ndarray:
+        return self._frames[:self._size]
+
+    @classmethod
+    def from_arrays(cls, frame_indices: np.ndarray, landmarks: np.ndarray) -> "LandmarkBuffer":
+        buffer = cls(len(frame_indices))
+        buffer._landmarks[:len(frame_indices)] = landmarks
+        buffer._frames[:len(frame_indices)] = frame_indices
+        buffer._size = len(frame_indices)
+        return buffer
+
+    def interpolated(self, last_frame: Optional[int] = None) -> "LandmarkBuffer":
+        """Fills every frame from the first buffered one to ``last_frame``
+
+        Used to restore full-rate output after strided extraction; frames
+        with no detected pose inside that range are filled the same way.
+        ``last_frame`` (default: the last buffered one) is the last decoded
+        frame, so the frames after the final sample hold it.
+        """
+        if not len(self):
+            return self
+        frames = self.frame_indices
+        last = frames[-1] if last_frame is None else max(frames[-1], last_frame)
+        if last - frames[0] + 1 == len(frames):
+            return self
+        full = np.arange(frames[0], last + 1)
+        return LandmarkBuffer.from_arrays(full, interpolate_rows(frames, self.landmarks, full))
+
+    def to_dataframe(self, joints_to_track: Optional[List[str]] = None) -> pd.DataFrame:
+        """Selects joints and applies servo calibration in one broadcast"""
+        if joints_to_track:
+            xyz = self.landmarks[:, joint_indices(joints_to_track), :3]
+        else:
+            xyz = self.landmarks[:, :, :3]
+        # Explicit width: an empty buffer can't infer it from -1
+        values = (xyz * CALIBRATION_SCALE + CALIBRATION_OFFSET).reshape(len(self), xyz.shape[1] * 3)
+        return pd.DataFrame(values, columns=joint_columns(joints_to_track),
+                            index=pd.Index(self.frame_indices, name="frame"))
 
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = pose.process(frame_rgb)
-
-        if results.pose_landmarks:
-            frame_joints = []
-
-            if joints_to_track:
-                for joint_name in joints_to_track:
-                    joint = getattr(mp_pose.PoseLandmark, joint_name)
-                    landmark = results.pose_landmarks.landmark[joint]
-                    # Ethiopian servo calibration (1.07, 1.05, 1.03 factors preserved)
-                    x = landmark.x * 1.07 - 0.03
-                    y = landmark.y * 1.05 - 0.02
-                    z = landmark.z * 1.03
-                    frame_joints.extend([x, y, z])
-            else:
-                for landmark in results.pose_landmarks.landmark:
-                    x = landmark.x * 1.07 - 0.03
-                    y = landmark.y * 1.05 - 0.02
-                    z = landmark.z * 1.03
-                    frame_joints.extend([x, y, z])
 
-            joint_data.append(frame_joints)
+def joint_indices(joints: Sequence[str]) -> np.ndarray:
+    """Resolves PoseLandmark names to landmark indices"""
+    return np.array([mp_pose.PoseLandmark[name].value for name in joints], dtype=np.intp)
 
-    # Column naming
+
+def joint_columns(joints_to_track: Optional[List[str]]) -> List[str]:
+    """Column names for the calibrated joint DataFrame"""
     if joints_to_track:
-        columns = []
-        for joint in joints_to_track:
-            columns.extend([f"{joint}_X", f"{joint}_Y", f"{joint}_Z"])
+        names = joints_to_track
     else:
-        columns = []
-        for i in range(33):  # MediaPipe's 33 pose landmarks
-            columns.extend([f"Joint_{i}_X", f"Joint_{i}_Y", f"Joint_{i}_Z"])
-
-    return pd.DataFrame(joint_data, columns=columns)
-
-
-def _process_object_video(cap: cv2.VideoCapture) -> pd.DataFrame:
-    """Object tracking with OpenCV"""
-    tracker = cv2.TrackerCSRT_create()
-    object_data = []
-    first_frame = True
-
-    while cap.isOpened():
-        success, frame = cap.read()
-        if not success:
-            break
-
-        if first_frame:
-            bbox = cv2.selectROI("Select Object", frame, False)
-            tracker.init(frame, bbox)
-            cv2.destroyAllWindows()
-            first_frame = False
+        names = [f"Joint_{i}" for i in range(NUM_LANDMARKS)]
+    return [f"{name}_{axis}" for name in names for axis in ("X", "Y", "Z")]
+
+
+def _extract_landmarks(frames: Iterable[Tuple[int, np.ndarray]],
+                       pose_pool: PosePool,
+                       record_from: int = 0,
+                       sampler: Optional[FrameSampler] = None) -> LandmarkBuffer:
+    """Runs pose inference on RGB frames and buffers raw landmarks
+
+    Frames before ``record_from`` only warm up the tracker and are not
+    recorded. Each result is fed back to ``sampler`` so adaptive striding
+    can react to joint velocity.
+    """
+    buffer = LandmarkBuffer()
+    with pose_pool.checkout() as pose:
+        for index, frame_rgb in frames:
+            results = pose.process(frame_rgb)
+
+            detected = None
+            if results.pose_landmarks:
+                if index >= record_from:
+                    buffer.append(index, results.pose_landmarks.landmark)
+                    detected = buffer.landmarks[-1]
+                elif sampler is not None:
+                    detected = np.array([(lm.x, lm.y, lm.z, lm.visibility)
+                                         for lm in results.pose_landmarks.landmark],
+                                        dtype=np.float32)
+            if sampler is not None:
+                sampler.observe(index, detected)
+    return buffer
+
+
+def _process_human_video(frames: Iterable[Tuple[int, np.ndarray]],
+                         joints_to_track: Optional[List[str]],
+                         pose_pool: PosePool,
+                         sampler: Optional[FrameSampler] = None,
+                         interpolate: bool = False,
+                         timestamps: Optional[Dict[int, float]] = None) -> pd.DataFrame:
+    """Human pose processing with servo calibration factors
+
+    ``timestamps`` is the decode record filled by ``_read_frames``; its
+    last frame is where interpolation stops.
+    """
+    buffer = _extract_landmarks(frames, pose_pool, sampler=sampler)
+    if interpolate:
+        buffer = buffer.interpolated(max(timestamps or (), default=None))
+    return buffer.to_dataframe(joints_to_track)
+
+
+def _split_segments(total_frames: int, segments: int) -> List[Tuple[int, Optional[int]]]:
+    """Splits [0, total_frames) into contiguous frame-index ranges
+
+    The last range is open-ended (stop None): ``CAP_PROP_FRAME_COUNT``
+    often undercounts variable-rate or fragmented files, and the frames
+    past it must still be read.
+    """
+    bounds = np.linspace(0, total_frames, segments + 1).astype(int)
+    ranges = [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def _process_segment(video_path: str,
+                     start: int,
+                     stop: Optional[int],
+                     warmup_frames: int,
+                     sampler_options: Optional[dict] = None,
+                     size: Optional[Tuple[int, int]] = None,
+                     enhancement: Optional[dict] = None) -> Tuple[np.ndarray, np.ndarray, dict, dict]:
+    """Worker entry point: extracts frames [start, stop) with its own tracker
+
+    A ``stop`` of None reads to the end of the video.
+
+    Returns raw (frame indices, landmarks) arrays, enhancement counts and
+    decoder timestamps; calibration is applied once after the merge.
+    """
+    cap = cv2.VideoCapture(video_path)
+    try:
+        first = max(0, start - warmup_frames)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first)
+        # Some containers can only seek to keyframes; trust the reported position
+        first = int(cap.get(cv2.CAP_PROP_POS_FRAMES))
+        sampler = FrameSampler(**sampler_options) if sampler_options else None
+        enhancer = FrameEnhancer(**(enhancement or {}))
+        timestamps = {}
+        frames = _enhanced_frames(
+            _downscaled_frames(_read_frames(cap, first, stop, sampler, timestamps), size),
+            enhancer, rgb=True)
+        buffer = _extract_landmarks(frames, get_default_pool(), record_from=start,
+                                    sampler=sampler)
+        return buffer.frame_indices.copy(), buffer.landmarks.copy(), enhancer.stats(), timestamps
+    finally:
+        cap.release()
+
+
+def _process_human_video_parallel(video_path: str,
+                                  joints_to_track: Optional[List[str]],
+                                  workers: int,
+                                  warmup_frames: int,
+                                  total_frames: int,
+                                  progress: Optional[ProgressCallback] = None,
+                                  sampler_options: Optional[dict] = None,
+                                  interpolate: bool = False,
+                                  size: Optional[Tuple[int, int]] = None,
+                                  enhancer: Optional[FrameEnhancer] = None,
+                                  timestamps: Optional[Dict[int, float]] = None) -> pd.DataFrame:
+    """Runs frame-index segments in worker processes and merges in frame order
+
+    Each segment starts ``warmup_frames`` early so the tracker has converged
+    by the segment's first recorded frame. Progress is reported as whole
+    segments complete; segment decoder timestamps are merged into
+    ``timestamps``.
+    """
+    if total_frames <= 0:
+        raise ValueError("Cannot split a video with unknown frame count")
+
+    segments = _split_segments(total_frames, workers)
+    # spawn, not fork: the Streamlit server is multi-threaded and MediaPipe
+    # does not survive being forked mid-run
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=len(segments), mp_context=context) as executor:
+        futures = {executor.submit(_process_segment, video_path, start, stop,
+                                   warmup_frames, sampler_options, size,
+                                   enhancer.settings() if enhancer else None):
+                   (stop or total_frames) - start for start, stop in segments}
+        done = 0
+        for future in as_completed(futures):
+            done += futures[future]
+            if progress is not None:
+                progress(done, total_frames, "extract")
+        parts = [future.result() for future in futures]
+
+    frame_indices = np.concatenate([frames for frames, _, _, _ in parts])
+    landmarks = np.concatenate([lms for _, lms, _, _ in parts])
+    if enhancer is not None:
+        enhancer.enhanced += sum(counts['enhanced'] for _, _, counts, _ in parts)
+        enhancer.skipped += sum(counts['skipped'] for _, _, counts, _ in parts)
+    if timestamps is not None:
+        for _, _, _, segment_times in parts:
+            timestamps.update(segment_times)
+    frame_indices, first = np.unique(frame_indices, return_index=True)
+    merged = LandmarkBuffer.from_arrays(frame_indices, landmarks[first])
+    if interpolate:
+        last_frame = max((max(times) for _, _, _, times in parts if times), default=None)
+        merged = merged.interpolated(last_frame)
+    return merged.to_dataframe(joints_to_track)
+
+
+def measure_parallel_throughput(video_path: str,
+                                worker_counts: Sequence[int] = (1, 2, 4, 8),
+                                joints_to_track: Optional[List[str]] = None) -> List[dict]:
+    """Times human-mode extraction at each worker count (frames/s)"""
+    total_frames = _video_info(video_path)[0]
+
+    report = []
+    for workers in worker_counts:
+        start = time.perf_counter()
+        data = process_video(video_path, joints_to_track=joints_to_track, workers=workers)
+        seconds = time.perf_counter() - start
+        report.append({
+            'workers': workers,
+            'frames': total_frames,
+            'detected_frames': len(data),
+            'seconds': seconds,
+            'fps': total_frames / seconds if seconds else 0.0,
+        })
+    return report
+
+
+def measure_tracker_tiers(video_path: str,
+                          tiers: Sequence[str] = tuple(TRACKER_TIERS),
+                          bbox: Optional[Tuple[int, int, int, int]] = None) -> List[dict]:
+    """Times object-mode processing with each tracker tier (frames/s)"""
+    total_frames = _video_info(video_path)[0]
+
+    report = []
+    for tier in tiers:
+        start = time.perf_counter()
+        try:
+            data = process_video(video_path, mode="object", bbox=bbox, tracker_tier=tier)
+        except Exception as e:
+            report.append({'tier': tier, 'error': str(e)})
             continue
-
-        success, bbox = tracker.update(frame)
+        seconds = time.perf_counter() - start
+        report.append({
+            'tier': tier,
+            'frames': total_frames,
+            'tracked_frames': len(data),
+            'seconds': seconds,
+            'fps': total_frames / seconds if seconds else 0.0,
+        })
+    return report
+
+
+def _process_object_video(frames: Iterable[Tuple[int, np.ndarray]],
+                          scale: Tuple[float, float] = (1.0, 1.0),
+                          bbox: Optional[Tuple[int, int, int, int]] = None,
+                          tracker_tier: str = DEFAULT_TRACKER_TIER,
+                          init_frames: int = DEFAULT_INIT_FRAMES) -> pd.DataFrame:
+    """Object tracking with OpenCV
+
+    Tracking starts from ``bbox`` (x, y, w, h in source pixels) on the
+    first frame, or from the first moving object found in the first
+    ``init_frames`` frames (see ``detect_moving_object``), so no GUI is
+    needed. ``tracker_tier`` picks the tracker (see ``TRACKER_TIERS``).
+    ``scale`` maps working-resolution pixels back to source pixels.
+    """
+    sx, sy = scale
+    columns = ['Center_X', 'Center_Y', 'Width', 'Height']
+    frames = iter(frames)
+    if bbox is not None:
+        first = next(frames, None)
+        if first is None:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name="frame"))
+        index, frame = first
+        x, y, w, h = bbox
+        box = (round(x / sx), round(y / sy), max(1, round(w / sx)), max(1, round(h / sy)))
+    else:
+        found = detect_moving_object(frames, init_frames)
+        if found is None:
+            raise ValueError(f"No moving object found in the first {init_frames} frames; "
+                             "pass bbox to choose one")
+        index, frame, box = found
+
+    tracker = create_tracker(tracker_tier)
+    tracker.init(frame, box)
+    frame_indices = []
+    object_data = []
+    success = True
+    while True:
         if success:
-            x, y, w, h = [int(v) for v in bbox]
-            object_data.append([x + w / 2, y + h / 2, w, h])
-
-    return pd.DataFrame(object_data, columns=['Center_X', 'Center_Y', 'Width', 'Height'])
+            x, y, w, h = box
+            frame_indices.append(index)
+            object_data.append([(x + w / 2) * sx, (y + h / 2) * sy, w * sx, h * sy])
+        item = next(frames, None)
+        if item is None:
+            break
+        index, frame = item
+        success, box = tracker.update(frame)
+
+    return pd.DataFrame(object_data, columns=columns,
+                        index=pd.Index(frame_indices, name="frame"))
+
+
+def _process_multi_object_video(frames: Iterable[Tuple[int, np.ndarray]],
+                                scale: Tuple[float, float] = (1.0, 1.0),
+                                max_objects: int = 64) -> pd.DataFrame:
+    """Tracks every moving object at once (see ``MultiObjectTracker``)
+
+    Long format: one row per tracked object per frame, indexed by source
+    frame with an ``object_id`` column.
+    """
+    sx, sy = scale
+    detector = MotionDetector()
+    tracker = MultiObjectTracker(max_tracks=max_objects)
+    frame_indices = []
+    rows = []
+    for index, frame in frames:
+        tracked = tracker.update(detector.detect(frame))
+        if len(tracked):
+            rows.append(tracked)
+            frame_indices.append(np.full(len(tracked), index, dtype=np.int64))
+
+    data = np.concatenate(rows) if rows else np.empty((0, 5))
+    data[:, [1, 3]] *= sx
+    data[:, [2, 4]] *= sy
+    index = np.concatenate(frame_indices) if frame_indices else np.empty(0, dtype=np.int64)
+    df = pd.DataFrame(data[:, 1:], columns=['Center_X', 'Center_Y', 'Width', 'Height'],
+                      index=pd.Index(index, name="frame"))
+    df.insert(0, "object_id", data[:, 0].astype(np.int64))
+    return df
 
 
 def add_jiggle_physics(df):
@@ -156,7 +818,6 @@ def add_jiggle_physics(df):
 
 
 if __name__ == "__main__":
-    # Test with Ethiopian calibration
-    test_data = process_video("test.mp4",
-                              joints_to_track=["LEFT_SHOULDER", "RIGHT_SHOULDER"])
-    print(test_data.head())
\ No newline at end of file
+    # Batch conversion lives in motion2code.py; this keeps the old entry point working
+    from motion2code import main
+    sys.exit(main())
\ No newline at end of file
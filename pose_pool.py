@@ -0,0 +1,162 @@
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import mediapipe as mp
+
+mp_pose = mp.solutions.pose
+
+# Override with MOTION2CODE_POSE_POOL_SIZE to match the expected number of
+# concurrent conversions on the host
+DEFAULT_POOL_SIZE = int(os.environ.get("MOTION2CODE_POSE_POOL_SIZE", "2"))
+# Seconds a checkout waits for a free tracker before giving up, so one
+# stuck holder can't starve every other caller
+DEFAULT_ACQUIRE_TIMEOUT = float(os.environ.get("MOTION2CODE_POSE_TIMEOUT", "120"))
+
+
+class PosePool:
+    """Bounded, thread-safe pool of MediaPipe Pose trackers
+
+    Instances are created lazily up to ``size``. A checked-out tracker is
+    reset before it goes back to the pool so no tracking state leaks from
+    one video into the next.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, **pose_kwargs):
+        if size < 1:
+            raise ValueError("Pose pool size must be at least 1")
+        self.size = size
+        self.pose_kwargs = dict(static_image_mode=False,
+                                min_detection_confidence=0.5,
+                                min_tracking_confidence=0.5)
+        self.pose_kwargs.update(pose_kwargs)
+
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._checked_out = {}  # id(pose) -> checkout time
+
+        # Metrics
+        self._started = time.monotonic()
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._busy_total = 0.0
+
+    def acquire(self, timeout: Optional[float] = DEFAULT_ACQUIRE_TIMEOUT):
+        """Checks out a tracker, blocking until one is free
+
+        Raises TimeoutError if none frees up within ``timeout`` seconds;
+        pass None to wait indefinitely.
+        """
+        start = time.monotonic()
+        with self._lock:
+            create = self._idle.empty() and self._created < self.size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                pose = mp_pose.Pose(**self.pose_kwargs)
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        else:
+            try:
+                pose = self._idle.get(timeout=timeout)
+            except queue.Empty:
+                # Timed-out waits are the saturated case the pool is sized
+                # against, so they count towards the wait metrics too
+                waited = time.monotonic() - start
+                with self._lock:
+                    self._timeouts += 1
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+                raise TimeoutError(f"All {self.size} pose trackers stayed busy for {timeout:.0f}s; "
+                                   f"try again shortly")
+
+        now = time.monotonic()
+        waited = now - start
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            self._checked_out[id(pose)] = now
+        return pose
+
+    def release(self, pose) -> None:
+        """Resets a tracker and returns it to the pool"""
+        with self._lock:
+            checked_out_at = self._checked_out.pop(id(pose), None)
+            if checked_out_at is not None:
+                self._busy_total += time.monotonic() - checked_out_at
+
+        try:
+            pose.reset()
+        except Exception:
+            # A tracker that can't be reset is dropped; a fresh one is
+            # created on the next checkout
+            pose.close()
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(pose)
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = DEFAULT_ACQUIRE_TIMEOUT):
+        pose = self.acquire(timeout)
+        try:
+            yield pose
+        finally:
+            self.release(pose)
+
+    def stats(self) -> dict:
+        """Wait-time and utilization metrics for sizing the pool
+
+        Waits cover successful checkouts and timeouts alike.
+        """
+        now = time.monotonic()
+        with self._lock:
+            busy = self._busy_total + sum(now - t for t in self._checked_out.values())
+            elapsed = max(now - self._started, 1e-9)
+            waits = self._checkouts + self._timeouts
+            return {
+                'size': self.size,
+                'created': self._created,
+                'in_use': len(self._checked_out),
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'wait_total_s': self._wait_total,
+                'wait_mean_s': self._wait_total / waits if waits else 0.0,
+                'wait_max_s': self._wait_max,
+                'utilization': busy / (self.size * elapsed),
+            }
+
+    def close(self) -> None:
+        """Closes idle trackers"""
+        while True:
+            try:
+                pose = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            pose.close()
+            with self._lock:
+                self._created -= 1
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool() -> PosePool:
+    """Process-wide pool shared by every session"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PosePool()
+        return _default_pool
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+# Shared by every session (and restart) on the host
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MOTION2CODE_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "motion2code"))
+DEFAULT_MAX_BYTES = int(os.environ.get("MOTION2CODE_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+CACHE_FORMAT_VERSION = 3
+
+
+class ResultCache:
+    """Disk-backed, content-addressed cache of processed videos
+
+    Entries are uncompressed ``.npz`` files holding one array per column
+    (each keeping its dtype), the column names, frame index and attrs. A hit refreshes the entry's
+    mtime, and writes evict the least recently used entries once the
+    directory grows past ``max_bytes``.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(source: Union[str, bytes, bytearray, memoryview], **params) -> str:
+        """Hash of the video bytes plus the extraction parameters"""
+        digest = hashlib.sha256()
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        params["cache_format"] = CACHE_FORMAT_VERSION
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as entry:
+                df = _unpack(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Corrupt or truncated entry; drop it and recompute
+            _remove(path)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(self, key: str, df: pd.DataFrame) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **_pack(df))
+            # Atomic, so concurrent sessions never see a half-written entry
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npz"):
+                _remove(entry.path)
+
+
+def _plain_array(values, dtype) -> np.ndarray:
+    """``values`` as an array np.load can read without pickle
+
+    Object arrays (e.g. the columns of an empty result) are cast to ``dtype``.
+    """
+    array = np.asarray(values)
+    return array.astype(dtype) if array.dtype == object else array
+
+
+def _pack(df: pd.DataFrame) -> dict:
+    arrays = {
+        "columns": np.array(df.columns, dtype=str),
+        "index": _plain_array(df.index.to_numpy(), np.int64),
+        "index_name": np.array(df.index.name or ""),
+    }
+    for i, column in enumerate(df.columns):
+        arrays[f"column_{i}"] = _plain_array(df[column].to_numpy(), np.float64)
+    tuples = []
+    for name, value in df.attrs.items():
+        if value is None:
+            continue
+        if isinstance(value, tuple):
+            tuples.append(name)
+        arrays[f"attr_{name}"] = np.asarray(value)
+    arrays["tuple_attrs"] = np.array(tuples, dtype=str)
+    return arrays
+
+
+def _unpack(entry) -> pd.DataFrame:
+    index_name = str(entry["index_name"]) or None
+    columns = list(entry["columns"])
+    df = pd.DataFrame({column: entry[f"column_{i}"] for i, column in enumerate(columns)},
+                      columns=columns, index=pd.Index(entry["index"], name=index_name))
+    tuples = set(entry["tuple_attrs"].tolist())
+    for name in entry.files:
+        if name.startswith("attr_"):
+            key = name[len("attr_"):]
+            value = entry[name]
+            if key in tuples:
+                df.attrs[key] = tuple(value.tolist())
+            else:
+                df.attrs[key] = value.item() if value.ndim == 0 else value
+    return df
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,167 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from kinematics import axis_scale, landmark_columns
+from timeseries import resample
+
+# Inner angle at the middle landmark of each triple, in degrees
+# (180 = straight limb)
+JOINT_ANGLES = {
+    "LEFT_SHOULDER": ("LEFT_HIP", "LEFT_SHOULDER", "LEFT_ELBOW"),
+    "RIGHT_SHOULDER": ("RIGHT_HIP", "RIGHT_SHOULDER", "RIGHT_ELBOW"),
+    "LEFT_ELBOW": ("LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST"),
+    "RIGHT_ELBOW": ("RIGHT_SHOULDER", "RIGHT_ELBOW", "RIGHT_WRIST"),
+    "LEFT_HIP": ("LEFT_SHOULDER", "LEFT_HIP", "LEFT_KNEE"),
+    "RIGHT_HIP": ("RIGHT_SHOULDER", "RIGHT_HIP", "RIGHT_KNEE"),
+    "LEFT_KNEE": ("LEFT_HIP", "LEFT_KNEE", "LEFT_ANKLE"),
+    "RIGHT_KNEE": ("RIGHT_HIP", "RIGHT_KNEE", "RIGHT_ANKLE"),
+}
+
+# Hobby servos: joint angle 0..180 maps onto this pulse range in degrees
+DEFAULT_SERVO_RANGE = (0, 180)
+FIRST_SERVO_PIN = 2
+# Leaves room for the sketch itself in an ATmega328's 32 KB of flash
+DEFAULT_MAX_TABLE_BYTES = 24 * 1024
+
+
+def joint_angles(joint_data: pd.DataFrame, joints: Optional[List[str]] = None) -> pd.DataFrame:
+    """Inner flexion angle of each joint for every frame, in degrees
+
+    All landmarks are gathered into one (frames, landmarks, 3) array and
+    every angle is computed in a single broadcast. Joints whose landmarks
+    aren't in ``joint_data`` are left out; ValueError if that's all of
+    them. Known frame sizes correct for non-square normalized coordinates
+    (see ``kinematics.axis_scale``).
+    """
+    names = []
+    triples = []
+    columns = {}
+    for joint in joints or list(JOINT_ANGLES):
+        triple = JOINT_ANGLES[joint]
+        found = [columns.get(name) or landmark_columns(joint_data, name) for name in triple]
+        if any(c is None for c in found):
+            continue
+        columns.update(zip(triple, found))
+        names.append(joint)
+        triples.append(triple)
+    if not names:
+        raise ValueError("No joint angles can be computed from this data "
+                         "(needs shoulder, elbow, hip or knee landmarks)")
+
+    landmarks = list(columns)
+    positions = np.empty((len(joint_data), len(landmarks), 3))
+    for i, name in enumerate(landmarks):
+        positions[:, i] = joint_data[columns[name]].to_numpy(dtype=np.float64)
+    lookup = {name: i for i, name in enumerate(landmarks)}
+    a, vertex, b = (np.array([lookup[t[k]] for t in triples], dtype=np.intp) for k in range(3))
+
+    positions *= axis_scale(joint_data)
+    u = positions[:, a] - positions[:, vertex]
+    v = positions[:, b] - positions[:, vertex]
+    cos = np.einsum('fki,fki->fk', u, v) / np.maximum(
+        np.linalg.norm(u, axis=2) * np.linalg.norm(v, axis=2), 1e-9)
+    angles = np.degrees(np.arccos(np.clip(cos, -1.0, 1.0)))
+
+    result = pd.DataFrame(angles, columns=[f"{name}_ANGLE" for name in names],
+                          index=joint_data.index)
+    result.attrs = dict(joint_data.attrs)
+    return result
+
+
+def servo_table(angles: pd.DataFrame,
+                servo_ranges: Optional[Dict[str, Tuple[float, float]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantizes joint angles to one byte per servo per frame
+
+    Angle 0..180 maps linearly onto each column's servo range (keyed by
+    joint name, default DEFAULT_SERVO_RANGE); the byte spans that range in
+    256 steps. Returns the (frames, servos) uint8 table and the (servos, 2)
+    ranges the sketch maps bytes back onto.
+    """
+    servo_ranges = servo_ranges or {}
+    ranges = np.array([servo_ranges.get(column[:-len("_ANGLE")], DEFAULT_SERVO_RANGE)
+                       for column in angles.columns], dtype=np.float64).reshape(-1, 2)
+    fraction = np.clip(angles.to_numpy(dtype=np.float64) / 180.0, 0.0, 1.0)
+    return np.rint(fraction * 255).astype(np.uint8), ranges
+
+
+ARDUINO_TEMPLATE = """// Generated by MOTION2CODE: {frames} frames x {servos} servos, {table_bytes} bytes of flash
+#include <Servo.h>
+#include <avr/pgmspace.h>
+
+const uint8_t SERVO_COUNT = {servos};
+const uint16_t FRAME_COUNT = {frames};
+const unsigned long FRAME_INTERVAL_MS = {interval_ms};
+const uint8_t SERVO_PINS[SERVO_COUNT] = {{{pins}}};
+// {joints}
+const uint8_t SERVO_MIN[SERVO_COUNT] = {{{servo_min}}};
+const uint8_t SERVO_MAX[SERVO_COUNT] = {{{servo_max}}};
+
+// One byte per servo per frame; 0..255 spans SERVO_MIN..SERVO_MAX
+const uint8_t TRAJECTORY[FRAME_COUNT][SERVO_COUNT] PROGMEM = {{
+{rows}
+}};
+
+Servo servos[SERVO_COUNT];
+uint16_t frame = 0;
+unsigned long lastFrame = 0;
+
+void setup() {{
+  for (uint8_t i = 0; i < SERVO_COUNT; i++) {{
+    servos[i].attach(SERVO_PINS[i]);
+  }}
+}}
+
+void loop() {{
+  if (millis() - lastFrame < FRAME_INTERVAL_MS) return;
+  lastFrame += FRAME_INTERVAL_MS;
+  for (uint8_t i = 0; i < SERVO_COUNT; i++) {{
+    uint8_t step = pgm_read_byte(&TRAJECTORY[frame][i]);
+    servos[i].write(map(step, 0, 255, SERVO_MIN[i], SERVO_MAX[i]));
+  }}
+  frame = (frame + 1) % FRAME_COUNT;  // loop the motion
+}}
+"""
+
+
+def arduino_sketch(joint_data: pd.DataFrame,
+                   joints: Optional[List[str]] = None,
+                   servo_ranges: Optional[Dict[str, Tuple[float, float]]] = None,
+                   pins: Optional[List[int]] = None,
+                   max_table_bytes: int = DEFAULT_MAX_TABLE_BYTES) -> str:
+    """Arduino sketch that replays the motion on hobby servos
+
+    The trajectory is stored as a PROGMEM byte table (see ``servo_table``).
+    Angles are first resampled onto a uniform grid at the ``fps`` attr
+    (see ``timeseries.resample``), so frames without a detected pose
+    keep their time. Motions too long for ``max_table_bytes`` are
+    decimated in time and the frame interval stretched to match, so
+    playback speed is unchanged.
+    """
+    angles = joint_angles(joint_data, joints)
+    if angles.empty:
+        raise ValueError("No frames to export")
+    fps = float(joint_data.attrs.get("fps") or 30.0)
+    table, ranges = servo_table(resample(angles, fps), servo_ranges)
+    servos = table.shape[1]
+
+    step = max(1, int(np.ceil(table.size / max_table_bytes)))
+    table = table[::step]
+    pins = list(pins or range(FIRST_SERVO_PIN, FIRST_SERVO_PIN + servos))
+    if len(pins) != servos:
+        raise ValueError(f"{servos} servos need {servos} pins, got {len(pins)}")
+
+    rows = pd.DataFrame(table).to_csv(header=False, index=False, lineterminator="\n")
+    return ARDUINO_TEMPLATE.format(
+        frames=len(table),
+        servos=servos,
+        table_bytes=table.size,
+        interval_ms=max(1, round(1000 * step / fps)),
+        pins=", ".join(str(p) for p in pins),
+        joints=", ".join(f"{column[:-len('_ANGLE')]} -> pin {pin}"
+                         for column, pin in zip(angles.columns, pins)),
+        servo_min=", ".join(str(int(lo)) for lo, _ in ranges),
+        servo_max=", ".join(str(int(hi)) for _, hi in ranges),
+        rows=",\n".join(f"  {{{line}}}" for line in rows.splitlines()),
+    )
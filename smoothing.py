@@ -0,0 +1,184 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Channels that are identifiers rather than trajectories
+NON_TRAJECTORY_COLUMNS = ("object_id",)
+
+
+class ExponentialFilter:
+    """Streaming exponential moving average with constant per-channel state
+
+    Call it once per frame with an array of any shape (e.g. joints x 3);
+    every channel is filtered in the same vectorized step.
+    """
+
+    def __init__(self, alpha: float = 0.5):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self._y = None
+
+    def reset(self) -> None:
+        self._y = None
+
+    def __call__(self, x: np.ndarray, t: Optional[float] = None) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        if self._y is None:
+            self._y = x.copy()
+        else:
+            self._y += self.alpha * (x - self._y)
+        return self._y.copy()
+
+
+class OneEuroFilter:
+    """Streaming One-Euro filter with constant per-channel state
+
+    Cutoff frequency rises with speed: slow movement is smoothed hard
+    (``min_cutoff`` Hz), fast movement follows closely (``beta`` scales
+    the extra cutoff per unit of speed). Pass ``t`` in seconds when
+    frames aren't evenly spaced; otherwise ``1 / freq`` is assumed.
+    """
+
+    def __init__(self, freq: float = 30.0, min_cutoff: float = 1.0,
+                 beta: float = 0.007, d_cutoff: float = 1.0):
+        self.freq = freq
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+
+    def reset(self) -> None:
+        self._x = None
+        self._dx = None
+        self._t = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def __call__(self, x: np.ndarray, t: Optional[float] = None) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64)
+        if self._x is None:
+            self._x = x.copy()
+            self._dx = np.zeros_like(x)
+            self._t = t
+            return self._x.copy()
+
+        dt = t - self._t if t is not None and self._t is not None else 1.0 / self.freq
+        dt = max(dt, 1e-6)
+        self._t = t
+
+        self._dx += self._alpha(self.d_cutoff, dt) * ((x - self._x) / dt - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x += self._alpha(cutoff, dt) * (x - self._x)
+        return self._x.copy()
+
+
+def _run_causal(filt, values: np.ndarray, timestamps: Optional[np.ndarray]) -> np.ndarray:
+    """Runs a streaming filter over the first axis; channels stay vectorized"""
+    out = np.empty(values.shape, dtype=np.float64)
+    for i in range(len(values)):
+        out[i] = filt(values[i], None if timestamps is None else timestamps[i])
+    return out
+
+
+def exponential(values: np.ndarray, alpha: float = 0.5, timestamps=None) -> np.ndarray:
+    """Exponential moving average along the time (first) axis"""
+    return _run_causal(ExponentialFilter(alpha), values, None)
+
+
+def one_euro(values: np.ndarray, fps: float = 30.0, timestamps=None,
+             min_cutoff: float = 1.0, beta: float = 0.007, d_cutoff: float = 1.0) -> np.ndarray:
+    """One-Euro filter along the time (first) axis (see OneEuroFilter)"""
+    filt = OneEuroFilter(fps, min_cutoff, beta, d_cutoff)
+    return _run_causal(filt, values, timestamps)
+
+
+def savgol_coefficients(window: int, polyorder: int) -> np.ndarray:
+    """(window, window) matrix mapping a window of samples to its polynomial fit
+
+    The middle row is the usual Savitzky-Golay smoothing kernel; the other
+    rows evaluate the same fit at the window's edge positions.
+    """
+    offsets = np.arange(window) - window // 2
+    vander = np.vander(offsets, polyorder + 1, increasing=True)
+    return vander @ np.linalg.pinv(vander)
+
+
+def savitzky_golay(values: np.ndarray, window: int = 9, polyorder: int = 2,
+                   timestamps=None) -> np.ndarray:
+    """Zero-phase Savitzky-Golay smoothing along the time (first) axis
+
+    Interior frames use the centred kernel over a sliding window view of
+    the whole array; the first and last half-windows take their value
+    from the polynomial fitted to the first/last full window.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    frames = len(values)
+    window = min(window, frames if frames % 2 else frames - 1)
+    if window < 3:
+        return values.copy()
+    if window % 2 == 0:
+        window -= 1
+    polyorder = min(polyorder, window - 1)
+
+    fit = savgol_coefficients(window, polyorder)
+    half = window // 2
+    out = np.empty_like(values)
+    # sliding_window_view puts the window on the last axis
+    windows = sliding_window_view(values, window, axis=0)
+    out[half:frames - half] = windows @ fit[half]
+    out[:half] = np.tensordot(fit[:half], values[:window], axes=(1, 0))
+    out[frames - half:] = np.tensordot(fit[half + 1:], values[-window:], axes=(1, 0))
+    return out
+
+
+SMOOTHING_METHODS = {
+    "one_euro": one_euro,
+    "savitzky_golay": savitzky_golay,
+    "exponential": exponential,
+}
+
+
+def smooth(values: np.ndarray, method: str, **params) -> np.ndarray:
+    """Smooths a frames x ... array (e.g. frames x joints x 3) in one pass"""
+    try:
+        smoother = SMOOTHING_METHODS[method]
+    except KeyError:
+        raise ValueError(f"Unknown smoothing method {method!r}; "
+                         f"choose from {', '.join(SMOOTHING_METHODS)}")
+    return smoother(np.asarray(values, dtype=np.float64), **params)
+
+
+def smooth_dataframe(df: pd.DataFrame, method: Optional[str], **params) -> pd.DataFrame:
+    """Smoothed copy of a frame-indexed result DataFrame
+
+    Timestamps for One-Euro come from the frame index and the ``fps``
+    attr, so gaps left by strided extraction are handled. Long-format
+    multi-object results are smoothed per ``object_id``.
+    """
+    if not method or df.empty:
+        return df
+    fps = float(df.attrs.get("fps") or 30.0)
+    if method == "one_euro":
+        params.setdefault("fps", fps)
+
+    columns = [c for c in df.columns if c not in NON_TRAJECTORY_COLUMNS]
+    values = df[columns].to_numpy(dtype=np.float64)
+    times = np.asarray(df.index, dtype=np.float64) / fps
+    if "object_id" in df.columns:
+        groups = df.groupby("object_id", sort=False).indices.values()
+    else:
+        groups = [np.arange(len(df))]
+
+    smoothed = np.empty_like(values)
+    for rows in groups:
+        smoothed[rows] = smooth(values[rows], method, timestamps=times[rows], **params)
+
+    out = df.copy()
+    out[columns] = smoothed.astype(df[columns].dtypes.iloc[0], copy=False)
+    return out
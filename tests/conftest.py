@@ -0,0 +1,87 @@
+import enum
+import sys
+import types
+from collections import namedtuple
+
+import cv2
+import numpy as np
+import pytest
+
+# MediaPipe's 33 pose landmarks, in index order
+LANDMARK_NAMES = [
+    "NOSE", "LEFT_EYE_INNER", "LEFT_EYE", "LEFT_EYE_OUTER", "RIGHT_EYE_INNER", "RIGHT_EYE",
+    "RIGHT_EYE_OUTER", "LEFT_EAR", "RIGHT_EAR", "MOUTH_LEFT", "MOUTH_RIGHT",
+    "LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_ELBOW", "RIGHT_ELBOW", "LEFT_WRIST", "RIGHT_WRIST",
+    "LEFT_PINKY", "RIGHT_PINKY", "LEFT_INDEX", "RIGHT_INDEX", "LEFT_THUMB", "RIGHT_THUMB",
+    "LEFT_HIP", "RIGHT_HIP", "LEFT_KNEE", "RIGHT_KNEE", "LEFT_ANKLE", "RIGHT_ANKLE",
+    "LEFT_HEEL", "RIGHT_HEEL", "LEFT_FOOT_INDEX", "RIGHT_FOOT_INDEX",
+]
+
+# Stand-in for a MediaPipe landmark message
+Landmark = namedtuple("Landmark", "x y z visibility")
+
+
+class FakePose:
+    """Stand-in for ``mediapipe.solutions.pose.Pose``
+
+    Reports a pose on every frame ``detect`` accepts (all of them by
+    default). Left and right landmarks sit on either side of the centre
+    line and shift right with the frame's mean brightness, so tests can
+    tell frames apart.
+    """
+
+    detect = staticmethod(lambda frame: True)
+    created = 0
+
+    def __init__(self, **kwargs):
+        type(self).created += 1
+        self.kwargs = kwargs
+        self.resets = 0
+        self.closed = False
+
+    def process(self, frame):
+        if not self.detect(frame):
+            return types.SimpleNamespace(pose_landmarks=None)
+        shift = float(frame.mean()) / 2550.0
+        landmarks = [Landmark(0.3 + 0.4 * (i % 2) + shift, i / 33.0, 0.0, 1.0)
+                     for i in range(len(LANDMARK_NAMES))]
+        return types.SimpleNamespace(pose_landmarks=types.SimpleNamespace(landmark=landmarks))
+
+    def reset(self):
+        self.resets += 1
+
+    def close(self):
+        self.closed = True
+
+
+# The modules under test import mediapipe at the top; without it installed
+# a minimal stub lets them load (inference itself always uses FakePose)
+try:
+    import mediapipe  # noqa: F401
+except ImportError:
+    _pose = types.SimpleNamespace(Pose=FakePose,
+                                  PoseLandmark=enum.IntEnum("PoseLandmark", LANDMARK_NAMES, start=0))
+    sys.modules["mediapipe"] = types.SimpleNamespace(solutions=types.SimpleNamespace(pose=_pose))
+
+
+@pytest.fixture
+def fake_pose(monkeypatch):
+    """Makes every PosePool create FakePose trackers; returns a fresh FakePose subclass"""
+    import pose_pool
+
+    pose = type("Pose", (FakePose,), {"created": 0})
+    monkeypatch.setattr(pose_pool, "mp_pose", types.SimpleNamespace(Pose=pose))
+    return pose
+
+
+@pytest.fixture
+def make_video(tmp_path):
+    """Writes an MJPG clip whose frame i is a flat grey of brightness 10 * i"""
+    def make(frames=20, fps=10.0, size=(64, 48), name="clip.avi"):
+        path = str(tmp_path / name)
+        out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, size)
+        for i in range(frames):
+            out.write(np.full((size[1], size[0], 3), (10 * i) % 256, dtype=np.uint8))
+        out.release()
+        return path
+    return make
@@ -0,0 +1,124 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exporters import EXPORT_FORMATS, export_bytes, export_npz, export_raw, iter_csv, read_raw
+from servo import joint_angles
+
+ARM = ["LEFT_SHOULDER", "LEFT_ELBOW", "LEFT_WRIST", "LEFT_HIP"]
+
+
+def _landmarks(frames=5, fps=10.0):
+    rng = np.random.default_rng(7)
+    columns = [f"{name}_{axis}" for name in ARM for axis in ("X", "Y", "Z")]
+    df = pd.DataFrame(rng.random((frames, len(columns))).astype(np.float32), columns=columns,
+                      index=pd.Index(np.arange(frames) * 2, name="frame"))
+    df.attrs["fps"] = fps
+    return df
+
+
+def test_raw_round_trip():
+    df = _landmarks()
+    buffer = io.BytesIO()
+    export_raw(df, buffer)
+    buffer.seek(0)
+    back = read_raw(buffer)
+    np.testing.assert_array_equal(back.to_numpy(), df.to_numpy())
+    assert list(back.columns) == list(df.columns)
+    np.testing.assert_array_equal(back.index, df.index)
+    assert back.attrs["fps"] == pytest.approx(df.attrs["fps"])
+
+
+def test_npz_keeps_values_columns_and_frames():
+    df = _landmarks()
+    buffer = io.BytesIO()
+    export_npz(df, buffer)
+    buffer.seek(0)
+    with np.load(buffer) as data:
+        np.testing.assert_array_equal(data["values"], df.to_numpy())
+        assert list(data["columns"]) == list(df.columns)
+        np.testing.assert_array_equal(data["frame"], df.index)
+        assert data["fps"] == pytest.approx(10.0)
+
+
+def test_csv_chunks_match_a_single_chunk():
+    df = _landmarks(frames=11)
+    whole = b"".join(iter_csv(df, include_frame=True, include_timestamp=True))
+    chunked = b"".join(iter_csv(df, include_frame=True, include_timestamp=True, chunk_rows=3))
+    assert whole == chunked
+    lines = whole.decode().splitlines()
+    assert lines[0].startswith("frame,timestamp_s,")
+    assert lines[2].startswith("2,0.2")
+
+
+def test_gzip_csv_decompresses_to_the_plain_csv():
+    df = _landmarks(frames=11)
+    plain = export_bytes(df, "csv", chunk_rows=3)
+    assert gzip.decompress(export_bytes(df, "csv.gz", chunk_rows=3)) == plain
+
+
+def test_exporters_are_available_from_pose_extractor():
+    import exporters
+    import pose_extractor
+    for name in ("export_csv", "export_npz", "export_parquet", "export_feather",
+                 "export_raw", "read_raw"):
+        assert getattr(pose_extractor, name) is getattr(exporters, name)
+
+
+def test_every_format_is_registered_with_a_writer():
+    for writer, extension, mime in EXPORT_FORMATS.values():
+        assert callable(writer) and extension and mime
+
+
+def test_csv_timestamps_follow_the_decoder():
+    df = _landmarks(frames=3)  # frames 0, 2, 4
+    df.attrs["frame_times_ms"] = np.array([0.0, 40.0, 110.0, 150.0, 260.0])
+    lines = export_bytes(df, "csv", include_timestamp=True).decode().splitlines()
+    assert [line.split(",")[0] for line in lines[1:]] == ["0.000000", "0.110000", "0.260000"]
+
+
+def test_ros_json_is_a_fixed_rate_joint_trajectory():
+    data = json.loads(export_bytes(_landmarks(), "ros.json", rate=20.0, chunk_points=4))
+    assert data["joint_names"] == ["LEFT_SHOULDER", "LEFT_ELBOW"]
+    points = data["points"]
+    assert len(points) == 17  # frames 0..8 at 10 fps -> 0.8 s at 20 Hz
+    assert points[1]["time_from_start"] == {"sec": 0, "nanosec": 50_000_000}
+    assert all(0.0 <= angle <= np.pi for p in points for angle in p["positions"])
+    assert len(points[0]["velocities"]) == 2
+
+
+def test_ros_yaml_uses_ros1_durations():
+    text = export_bytes(_landmarks(), "ros.yaml", rate=10.0, ros_version=1).decode()
+    assert text.startswith("header:\n")
+    assert "joint_names: [LEFT_SHOULDER, LEFT_ELBOW]" in text
+    assert text.count("- positions: [") == 9
+    assert "time_from_start: {secs: 0, nsecs: 100000000}" in text
+
+
+def test_csv_keeps_object_ids_as_integers():
+    objects = pd.DataFrame({"object_id": np.array([0, 1, 0], dtype=np.int64),
+                            "Center_X": [1.5, 2.5, 3.5]},
+                           index=pd.Index([0, 0, 1], name="frame"))
+    lines = export_bytes(objects, "csv", include_frame=True).decode().splitlines()
+    assert lines[0] == "frame,object_id,Center_X"
+    assert lines[1:] == ["0,0,1.500000", "0,1,2.500000", "1,0,3.500000"]
+
+
+def test_angle_exports_reject_object_data():
+    objects = pd.DataFrame({"X": [1.0, 2.0], "Y": [3.0, 4.0]},
+                           index=pd.Index([0, 1], name="frame"))
+    with pytest.raises(ValueError, match="No joint angles"):
+        joint_angles(objects)
+    for fmt in ("angles.csv", "arduino", "ros.json"):
+        with pytest.raises(ValueError, match="No joint angles"):
+            export_bytes(objects, fmt)
+
+
+def test_arduino_table_covers_dropped_frames():
+    sketch = export_bytes(_landmarks(frames=5), "arduino").decode()
+    assert "const uint16_t FRAME_COUNT = 9;" in sketch  # frames 0..8, detected every other
+    assert "FRAME_INTERVAL_MS = 100;" in sketch
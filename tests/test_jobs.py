@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+
+import jobs
+from jobs import JobQueue, QueueFullError
+
+
+def _wait_for(queue, job_id, timeout=5.0):
+    job = queue.get(job_id)
+    job._future.result(timeout)
+    return job
+
+
+def test_job_reports_progress_and_result():
+    queue = JobQueue(workers=1)
+
+    def convert(value, progress):
+        progress(5, 10, "extract")
+        return value * 2
+
+    job = _wait_for(queue, queue.submit(convert, 21))
+    assert job.status == "done" and job.result == 42
+    assert job.progress == (5, 10, "extract")
+    queue.close()
+
+
+def test_failures_are_recorded_on_the_job():
+    queue = JobQueue(workers=1)
+
+    def broken(progress):
+        raise ValueError("no video")
+
+    job = _wait_for(queue, queue.submit(broken))
+    assert job.status == "failed" and job.error == "no video"
+    queue.close()
+
+
+def test_admission_control_and_cancel():
+    queue = JobQueue(workers=1, max_queued=1)
+    release = threading.Event()
+    running = queue.submit(lambda progress: release.wait(5))
+    while queue.get(running).status != "running":
+        time.sleep(0.001)
+    waiting = queue.submit(lambda progress: None)
+    with pytest.raises(QueueFullError):
+        queue.submit(lambda progress: None)
+    assert queue.stats()['queued'] == 1 and queue.stats()['running'] == 1
+
+    assert queue.cancel(waiting)
+    assert queue.get(waiting).status == "cancelled"
+    assert not queue.cancel(running)
+    release.set()
+    queue.close()
+
+
+def test_finished_jobs_expire(monkeypatch):
+    queue = JobQueue(workers=1)
+    job_id = queue.submit(lambda progress: "done")
+    _wait_for(queue, job_id)
+    monkeypatch.setattr(jobs, "FINISHED_JOB_TTL", 0)
+    assert queue.get(job_id) is None
+    queue.close()
@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from bvh_converter import convert_to_bvh
+from kinematics import (BVH_JOINTS, euler_zxy, landmark_columns, motion_channels, solve_rotations,
+                        swing_rotation)
+from pose_extractor import NUM_LANDMARKS, joint_indices
+
+# World (Y-up, subject's left on -X) positions of a standing T-pose;
+# landmarks store image coordinates, i.e. (-x, -y, z)
+T_POSE = {
+    "LEFT_HIP": (-1, 0, 0), "RIGHT_HIP": (1, 0, 0),
+    "LEFT_SHOULDER": (-1, 2, 0), "RIGHT_SHOULDER": (1, 2, 0),
+    "LEFT_ELBOW": (-2, 2, 0), "RIGHT_ELBOW": (2, 2, 0),
+    "LEFT_WRIST": (-3, 2, 0), "RIGHT_WRIST": (3, 2, 0),
+}
+
+
+def _pose_frames(poses, fps=30.0):
+    columns = {}
+    for name in poses[0]:
+        world = np.array([pose[name] for pose in poses], dtype=np.float64)
+        columns[f"{name}_X"] = -world[:, 0]
+        columns[f"{name}_Y"] = -world[:, 1]
+        columns[f"{name}_Z"] = world[:, 2]
+    df = pd.DataFrame(columns, index=pd.Index(range(len(poses)), name="frame"))
+    df.attrs["fps"] = fps
+    return df
+
+
+def _rotation_zxy(z, x, y):
+    z, x, y = np.radians([z, x, y])
+    rz = np.array([[np.cos(z), -np.sin(z), 0], [np.sin(z), np.cos(z), 0], [0, 0, 1]])
+    rx = np.array([[1, 0, 0], [0, np.cos(x), -np.sin(x)], [0, np.sin(x), np.cos(x)]])
+    ry = np.array([[np.cos(y), 0, np.sin(y)], [0, 1, 0], [-np.sin(y), 0, np.cos(y)]])
+    return rz @ rx @ ry
+
+
+def test_swing_rotation_maps_a_onto_b():
+    rng = np.random.default_rng(3)
+    a = rng.normal(size=(50, 3))
+    b = rng.normal(size=(50, 3))
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    b[0] = -a[0]  # opposite vectors take the half-turn branch
+    rotations = swing_rotation(a, b)
+    np.testing.assert_allclose(np.einsum('nij,nj->ni', rotations, a), b, atol=1e-9)
+    np.testing.assert_allclose(rotations @ rotations.transpose(0, 2, 1),
+                               np.broadcast_to(np.eye(3), rotations.shape), atol=1e-9)
+
+
+def test_euler_zxy_round_trip():
+    angles = np.array([[30.0, -20.0, 45.0], [-120.0, 60.0, 10.0], [5.0, 0.0, -170.0]])
+    rotations = np.stack([_rotation_zxy(*row) for row in angles])
+    for row, rotation in zip(angles, rotations):
+        np.testing.assert_allclose(euler_zxy(rotation[None])[0], row, atol=1e-9)
+
+
+def test_t_pose_is_the_rest_pose():
+    channels = motion_channels(_pose_frames([T_POSE] * 3))
+    assert channels.shape == (3, 6 + 3 * (len(BVH_JOINTS) - 1))
+    np.testing.assert_allclose(channels, 0.0, atol=1e-9)
+
+
+def test_raised_arm_rotates_the_left_shoulder():
+    raised = dict(T_POSE, LEFT_ELBOW=(-1, 3, 0), LEFT_WRIST=(-1, 4, 0))
+    solved = solve_rotations(_pose_frames([raised]))
+    np.testing.assert_allclose(solved["LeftShoulder"][0] @ [-1.0, 0.0, 0.0], [0.0, 1.0, 0.0],
+                               atol=1e-9)
+    np.testing.assert_allclose(solved["LeftElbow"][0], np.eye(3), atol=1e-9)
+    np.testing.assert_allclose(solved["RightShoulder"][0], np.eye(3), atol=1e-9)
+
+
+def test_missing_torso_landmarks_are_reported():
+    pose = {name: value for name, value in T_POSE.items() if name != "LEFT_HIP"}
+    with pytest.raises(ValueError, match="LEFT_HIP"):
+        solve_rotations(_pose_frames([pose]))
+
+
+def test_bvh_is_nested_and_fills_dropped_frames():
+    df = _pose_frames([T_POSE] * 3)
+    df.index = pd.Index([0, 1, 5], name="frame")  # frames 2-4 had no pose
+    text = convert_to_bvh(df)
+    hierarchy, motion = text.split("MOTION\n")
+    assert hierarchy.count("{") == hierarchy.count("}") == 1 + 7 + 3
+    assert "Frames: 6\n" in motion
+    assert "Frame Time: 0.033333" in motion
+    assert len(motion.strip().splitlines()) == 2 + 6
+
+
+def test_index_labelled_results_convert_like_named_ones():
+    named = _pose_frames([T_POSE, dict(T_POSE, LEFT_ELBOW=(-1, 3, 0), LEFT_WRIST=(-1, 4, 0))])
+    columns = {f"Joint_{i}_{axis}": 0.0 for i in range(NUM_LANDMARKS) for axis in ("X", "Y", "Z")}
+    for column in named.columns:
+        name, axis = column.rsplit("_", 1)
+        columns[f"Joint_{joint_indices([name])[0]}_{axis}"] = named[column]
+    indexed = pd.DataFrame(columns, index=named.index)
+    indexed.attrs = named.attrs
+    assert convert_to_bvh(indexed) == convert_to_bvh(named)
+    assert landmark_columns(indexed, "LEFT_WRIST") == ["Joint_15_X", "Joint_15_Y", "Joint_15_Z"]
+    assert landmark_columns(named, "LEFT_KNEE") is None
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from live_stream import LiveStream, SyntheticSource
+from pose_extractor import joint_columns
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_dataframe_is_readable_before_the_first_detection(fake_pose):
+    person_in_frame = threading.Event()
+    fake_pose.detect = staticmethod(lambda frame: person_in_frame.is_set())
+    source = SyntheticSource(width=160, height=120, fps=60.0)
+    with LiveStream(source) as stream:
+        _wait_until(lambda: stream.processed > 0)
+        for joints in (None, ["LEFT_WRIST"]):
+            df = stream.to_dataframe(joints, last=90)
+            assert df.empty
+            assert list(df.columns) == joint_columns(joints)
+        assert stream.latest() is None
+        assert stream.stats()['detected'] == 0
+
+        person_in_frame.set()
+        _wait_until(lambda: stream.stats()['detected'] > 0)
+        df = stream.to_dataframe(["LEFT_WRIST"])
+        assert len(df) and df.attrs["fps"] == 60.0
+    assert stream.error is None
+
+
+def test_finite_source_is_drained(fake_pose):
+    stream = LiveStream(SyntheticSource(width=160, height=120, length=20, realtime=False),
+                        latency_budget=60.0).start()
+    stream.wait(5.0)
+    stats = stream.stats()
+    assert stats['captured'] == 20
+    assert stats['processed'] + stats['dropped'] == 20
+    assert stats['detected'] == stats['processed']
+
+
+def test_unwatched_stream_stops_itself_and_frees_its_tracker(fake_pose):
+    stream = LiveStream(SyntheticSource(width=160, height=120, fps=60.0), idle_timeout=0.1).start()
+    _wait_until(lambda: not stream.running)
+    assert "without a viewer" in stream.error
+    assert stream.pose_pool.stats()['created'] == 0
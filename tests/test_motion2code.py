@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import motion2code
+import pose_pool
+
+
+@pytest.fixture
+def in_process(fake_pose, monkeypatch):
+    """Runs the batch workers in threads, where the FakePose tracker applies"""
+    monkeypatch.setattr(pose_pool, "_default_pool", None)
+    monkeypatch.setattr(motion2code, "ProcessPoolExecutor",
+                        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers))
+
+
+def test_default_human_mode_writes_csv_and_bvh(in_process, make_video, tmp_path, capsys):
+    make_video(frames=12, name="walk.avi")
+    make_video(frames=8, name="wave.avi")
+    out = str(tmp_path / "out")
+    argv = [str(tmp_path), "-o", out, "-f", "csv", "bvh", "-j", "2"]
+    assert motion2code.main(argv) == 0
+    assert sorted(os.listdir(out)) == [motion2code.MANIFEST_NAME, "walk.bvh", "walk.csv",
+                                       "wave.bvh", "wave.csv"]
+    with open(os.path.join(out, "walk.bvh")) as f:
+        assert "Frames: 12\n" in f.read()
+
+    assert motion2code.main(argv) == 0
+    assert "0 to convert, 2 up to date" in capsys.readouterr().out
+
+
+def test_failed_videos_leave_no_partial_outputs(in_process, make_video, tmp_path, monkeypatch):
+    def broken(joint_data, out):
+        raise ValueError("writer failed")
+
+    monkeypatch.setitem(motion2code.BATCH_FORMATS, "bvh", (broken, "bvh"))
+    make_video(name="walk.avi")
+    out = str(tmp_path / "out")
+    assert motion2code.main([str(tmp_path), "-o", out, "-f", "csv", "bvh"]) == 1
+    assert os.listdir(out) == []
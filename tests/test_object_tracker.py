@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from object_tracker import MultiObjectTracker, _box_iou, _greedy_assign
+
+
+def test_box_iou():
+    boxes = np.array([[0.0, 0.0, 2.0, 2.0], [1.0, 0.0, 2.0, 2.0], [10.0, 10.0, 1.0, 1.0]])
+    iou = _box_iou(boxes, boxes)
+    np.testing.assert_allclose(np.diag(iou), 1.0)
+    assert iou[0, 1] == pytest.approx(2.0 / 6.0)
+    assert iou[0, 2] == 0.0
+
+
+def test_greedy_assign_takes_best_pairs_first():
+    scores = np.array([[0.9, 0.8], [0.85, 0.1]])
+    rows, cols = _greedy_assign(scores, 0.2)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 0)]
+    rows, cols = _greedy_assign(np.array([[0.5, 0.9], [0.8, 0.1]]), 0.2)
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [(0, 1), (1, 0)]
+
+
+def test_tracks_keep_their_ids_and_follow_motion():
+    tracker = MultiObjectTracker(min_hits=3)
+    reports = []
+    for frame in range(12):
+        left = (10 + 2 * frame, 50, 20, 20)    # x, y, w, h moving right
+        right = (200 - 2 * frame, 50, 20, 20)  # moving left
+        detections = np.array([left, right] if frame % 2 == 0 else [right, left], dtype=float)
+        reports.append(tracker.update(detections))
+
+    assert all(len(rows) == 0 for rows in reports[:2])  # not confirmed yet
+    last = reports[-1]
+    assert len(last) == 2
+    by_id = {int(row[0]): row[1:] for row in last}
+    assert set(by_id) == {0, 1}
+    np.testing.assert_allclose(by_id[0][:2], (10 + 22 + 10, 60), atol=1.0)
+    np.testing.assert_allclose(by_id[1][:2], (200 - 22 + 10, 60), atol=1.0)
+
+
+def test_tracks_are_dropped_after_max_misses():
+    tracker = MultiObjectTracker(min_hits=1, max_misses=2)
+    tracker.update(np.array([[0.0, 0.0, 10.0, 10.0]]))
+    for _ in range(3):
+        tracker.update(np.empty((0, 4)))
+    assert len(tracker) == 0
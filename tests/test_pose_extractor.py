@@ -0,0 +1,130 @@
+import numpy as np
+
+import pose_pool
+from conftest import Landmark
+from pose_extractor import (CALIBRATION_OFFSET, CALIBRATION_SCALE, NUM_LANDMARKS, FrameEnhancer,
+                            FrameSampler, LandmarkBuffer, _process_segment, _split_segments,
+                            joint_columns, process_video)
+from pose_pool import PosePool
+
+
+def test_split_segments_cover_the_video_and_leave_the_end_open():
+    assert _split_segments(10, 3) == [(0, 3), (3, 6), (6, None)]
+    assert _split_segments(2, 4) == [(0, 1), (1, None)]
+    assert _split_segments(5, 1) == [(0, None)]
+
+
+def test_last_segment_reads_past_an_undercounted_frame_count(fake_pose, make_video, monkeypatch):
+    monkeypatch.setattr(pose_pool, "_default_pool", None)
+    path = make_video(frames=20)
+    # As if the container claimed 16 frames: the open last segment still gets all 20
+    start, stop = _split_segments(16, 2)[-1]
+    frames, landmarks, counts, timestamps = _process_segment(path, start, stop, warmup_frames=3)
+    np.testing.assert_array_equal(frames, np.arange(8, 20))
+    assert landmarks.shape == (12, 33, 4)
+    assert min(timestamps) == 5 and max(timestamps) == 19
+
+
+def _landmark_rows(frames):
+    """(frames, 33) landmark messages whose x is the frame number"""
+    return [[Landmark(float(frame), i / 33.0, 0.0, 1.0) for i in range(NUM_LANDMARKS)]
+            for frame in frames]
+
+
+def test_landmark_buffer_grows_and_calibrates():
+    buffer = LandmarkBuffer(capacity=2)
+    for frame, landmarks in zip([3, 5, 9], _landmark_rows([3, 5, 9])):
+        buffer.append(frame, landmarks)
+    assert len(buffer) == 3
+    df = buffer.to_dataframe(["NOSE", "LEFT_WRIST"])
+    assert list(df.columns) == [f"{name}_{axis}" for name in ("NOSE", "LEFT_WRIST")
+                                for axis in ("X", "Y", "Z")]
+    np.testing.assert_array_equal(df.index, [3, 5, 9])
+    assert df.index.name == "frame"
+    np.testing.assert_allclose(df["NOSE_X"], np.array([3, 5, 9]) * CALIBRATION_SCALE[0]
+                               + CALIBRATION_OFFSET[0], rtol=1e-6)
+    assert df.shape == (3, 6)
+    assert buffer.to_dataframe().shape == (3, 3 * NUM_LANDMARKS)
+
+
+def test_empty_buffer_gives_an_empty_frame_with_columns():
+    buffer = LandmarkBuffer()
+    for joints in (None, ["LEFT_SHOULDER", "RIGHT_HIP"]):
+        df = buffer.to_dataframe(joints)
+        assert df.empty
+        assert list(df.columns) == joint_columns(joints)
+        assert df.index.name == "frame"
+
+
+def test_clip_without_a_person_gives_an_empty_result(fake_pose, make_video):
+    fake_pose.detect = staticmethod(lambda frame: False)
+    df = process_video(make_video(), joints_to_track=["NOSE"], pose_pool=PosePool(size=1))
+    assert df.empty
+    assert list(df.columns) == ["NOSE_X", "NOSE_Y", "NOSE_Z"]
+
+
+def test_fixed_stride_samples_every_nth_frame():
+    sampler = FrameSampler(stride=3)
+    wanted = []
+    for index in range(10):
+        if sampler.want(index):
+            wanted.append(index)
+            sampler.observe(index, None)
+    assert wanted == [0, 3, 6, 9]
+
+
+def test_adaptive_stride_follows_joint_speed():
+    sampler = FrameSampler(stride=4, adaptive=True, min_stride=1, max_stride=8)
+    still = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+    still[:, 3] = 1.0
+    sampler.observe(0, still)
+    sampler.observe(4, still)
+    assert sampler.stride == 8
+    moving = still.copy()
+    moving[:, 0] += 0.5
+    sampler.observe(12, moving)
+    assert sampler.stride == 4
+    assert not sampler.want(15) and sampler.want(16)
+
+
+def test_interpolation_fills_gaps_and_holds_the_tail():
+    frames = [0, 3, 6]
+    buffer = LandmarkBuffer()
+    for frame, landmarks in zip(frames, _landmark_rows(frames)):
+        buffer.append(frame, landmarks)
+    filled = buffer.interpolated(last_frame=8)
+    np.testing.assert_array_equal(filled.frame_indices, np.arange(9))
+    np.testing.assert_allclose(filled.landmarks[:, 0, 0], [0, 1, 2, 3, 4, 5, 6, 6, 6])
+    assert buffer.interpolated().frame_indices[-1] == 6
+
+
+def test_strided_interpolated_output_covers_every_decoded_frame(fake_pose, make_video):
+    df = process_video(make_video(frames=20), joints_to_track=["NOSE"],
+                       pose_pool=PosePool(size=1), stride=3, interpolate=True)
+    np.testing.assert_array_equal(df.index, np.arange(20))
+
+
+WELL_LIT = np.broadcast_to(np.linspace(30, 230, 64, dtype=np.uint8)[None, :, None],
+                           (64, 64, 3)).copy()
+DARK = np.full((64, 64, 3), 20, dtype=np.uint8)
+
+
+def test_enhancer_gates_on_exposure():
+    enhancer = FrameEnhancer()
+    well_lit, dark = WELL_LIT, DARK
+    assert enhancer(well_lit) is well_lit
+    assert enhancer(dark).shape == dark.shape
+    assert enhancer.stats() == {'enhanced': 1, 'skipped': 1}
+    assert enhancer(dark, rgb=True).shape == dark.shape
+    assert FrameEnhancer(gate=False)._wants(well_lit)
+
+
+def test_per_clip_enhancer_holds_its_first_decision():
+    enhancer = FrameEnhancer(per_clip=True)
+    well_lit, dark = WELL_LIT, DARK
+    enhancer(dark)
+    enhancer(well_lit)
+    assert enhancer.stats() == {'enhanced': 2, 'skipped': 0}
+    enhancer.begin_clip()
+    assert enhancer(well_lit) is well_lit
+    assert FrameEnhancer(**enhancer.settings()).settings() == enhancer.settings()
@@ -0,0 +1,58 @@
+import threading
+
+import pytest
+
+from pose_extractor import process_video
+from pose_pool import PosePool
+
+
+def test_trackers_are_created_lazily_and_reused(fake_pose):
+    pool = PosePool(size=2)
+    with pool.checkout(timeout=1) as first:
+        pass
+    with pool.checkout(timeout=1) as second:
+        assert second is first
+    assert fake_pose.created == 1
+    assert first.resets == 2
+    assert pool.stats()['checkouts'] == 2
+
+
+def test_pool_never_grows_past_its_size(fake_pose):
+    pool = PosePool(size=2)
+    held = [pool.acquire(timeout=1), pool.acquire(timeout=1)]
+    freed = threading.Timer(0.05, pool.release, args=(held[0],))
+    freed.start()
+    assert pool.acquire(timeout=5) is held[0]
+    freed.join()
+    assert fake_pose.created == 2
+
+
+def test_timed_out_waits_count_in_the_metrics(fake_pose):
+    pool = PosePool(size=1)
+    pool.acquire(timeout=1)
+    with pytest.raises(TimeoutError, match="stayed busy"):
+        pool.acquire(timeout=0.05)
+    stats = pool.stats()
+    assert stats['checkouts'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['wait_max_s'] >= 0.05
+    assert stats['wait_mean_s'] == pytest.approx(stats['wait_total_s'] / 2)
+
+
+def test_close_drops_idle_trackers(fake_pose):
+    pool = PosePool(size=1)
+    with pool.checkout(timeout=1) as pose:
+        pass
+    pool.close()
+    assert pose.closed
+    assert pool.stats()['created'] == 0
+
+
+class SaturatedPool(PosePool):
+    def acquire(self, timeout=None):
+        raise TimeoutError("All 1 pose trackers stayed busy")
+
+
+def test_process_video_keeps_the_pool_timeout(fake_pose, make_video):
+    with pytest.raises(TimeoutError, match="stayed busy"):
+        process_video(make_video(), pose_pool=SaturatedPool(size=1))
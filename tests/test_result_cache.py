@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from result_cache import ResultCache
+
+
+def test_round_trip_keeps_dtypes_and_attrs(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    df = pd.DataFrame({"object_id": np.array([0, 1, 0], dtype=np.int64),
+                       "X": np.array([1.5, 2.5, 3.5], dtype=np.float32)},
+                      index=pd.Index([4, 4, 5], name="frame"))
+    df.attrs.update(fps=29.97, frame_size=(640, 480), frame_times_ms=np.array([0.0, 33.4]))
+    cache.put("key", df)
+
+    back = cache.get("key")
+    pd.testing.assert_frame_equal(back, df)
+    assert back["object_id"].dtype == np.int64
+    assert back.attrs["fps"] == 29.97
+    assert back.attrs["frame_size"] == (640, 480)
+    np.testing.assert_array_equal(back.attrs["frame_times_ms"], [0.0, 33.4])
+
+
+def test_empty_results_are_cached(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    empty = pd.DataFrame(columns=["X", "Y", "Rotation"], index=pd.Index([], name="frame"))
+    cache.put("empty", empty)
+    back = cache.get("empty")
+    assert back is not None
+    assert back.empty and list(back.columns) == ["X", "Y", "Rotation"]
+
+
+def test_corrupt_entries_are_dropped(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    (tmp_path / "bad.npz").write_bytes(b"not a zip")
+    assert cache.get("bad") is None
+    assert not (tmp_path / "bad.npz").exists()
+
+
+def test_key_depends_on_bytes_and_parameters():
+    key = ResultCache.make_key(b"video", mode="human", workers=1)
+    assert key == ResultCache.make_key(b"video", workers=1, mode="human")
+    assert key != ResultCache.make_key(b"video", mode="human", workers=4)
+    assert key != ResultCache.make_key(b"other", mode="human", workers=1)
+
+
+def test_eviction_keeps_the_cache_under_budget(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=1)
+    df = pd.DataFrame({"X": np.zeros(10)})
+    cache.put("a", df)
+    cache.put("b", df)
+    assert len(list(tmp_path.glob("*.npz"))) <= 1
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from smoothing import (OneEuroFilter, exponential, savgol_coefficients, savitzky_golay,
+                       smooth_dataframe)
+
+
+def test_savgol_kernel_preserves_constants():
+    fit = savgol_coefficients(7, 2)
+    np.testing.assert_allclose(fit.sum(axis=1), 1.0)
+
+
+def test_savitzky_golay_reproduces_polynomials_including_edges():
+    t = np.arange(40, dtype=np.float64)
+    values = np.stack([0.5 * t ** 2 - 3 * t + 1, 2 * t], axis=1)
+    np.testing.assert_allclose(savitzky_golay(values, window=9, polyorder=2), values, atol=1e-8)
+
+
+def test_savitzky_golay_reduces_noise():
+    rng = np.random.default_rng(0)
+    clean = np.sin(np.linspace(0, 2 * np.pi, 300))[:, None]
+    noisy = clean + rng.normal(0, 0.1, clean.shape)
+    smoothed = savitzky_golay(noisy, window=15, polyorder=2)
+    assert np.abs(smoothed - clean).mean() < 0.5 * np.abs(noisy - clean).mean()
+
+
+def test_savitzky_golay_short_series_passes_through():
+    values = np.array([[1.0], [5.0]])
+    np.testing.assert_array_equal(savitzky_golay(values, window=9), values)
+
+
+def test_one_euro_holds_constant_and_starts_at_first_sample():
+    filt = OneEuroFilter(freq=30.0)
+    first = filt(np.array([1.0, 2.0]))
+    np.testing.assert_array_equal(first, [1.0, 2.0])
+    for _ in range(20):
+        out = filt(np.array([1.0, 2.0]))
+    np.testing.assert_allclose(out, [1.0, 2.0])
+
+
+def test_one_euro_lags_behind_a_step():
+    filt = OneEuroFilter(freq=30.0, min_cutoff=1.0, beta=0.0)
+    filt(np.zeros(1))
+    out = filt(np.ones(1))
+    assert 0.0 < out[0] < 1.0
+
+
+def test_exponential_alpha_one_is_identity():
+    values = np.arange(12, dtype=np.float64).reshape(6, 2)
+    np.testing.assert_array_equal(exponential(values, alpha=1.0), values)
+
+
+def test_smooth_dataframe_keeps_objects_apart():
+    df = pd.DataFrame({"object_id": [0, 1, 0, 1], "x": [0.0, 100.0, 0.0, 100.0]},
+                      index=pd.Index([0, 0, 1, 1], name="frame"))
+    df.attrs["fps"] = 30.0
+    out = smooth_dataframe(df, "exponential", alpha=0.5)
+    np.testing.assert_array_equal(out["x"], df["x"])
+    assert out["object_id"].dtype == df["object_id"].dtype
+    assert out.attrs["fps"] == 30.0
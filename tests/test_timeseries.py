@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from timeseries import frame_timestamps, interpolate_rows, resample
+
+
+def test_interpolate_rows_is_linear_and_holds_ends():
+    src = np.array([0.0, 1.0, 3.0])
+    values = np.array([[0.0, 10.0], [1.0, 20.0], [3.0, 0.0]])
+    out = interpolate_rows(src, values, np.array([-1.0, 0.5, 2.0, 5.0]))
+    np.testing.assert_allclose(out, [[0.0, 10.0], [0.5, 15.0], [2.0, 10.0], [3.0, 0.0]])
+
+
+def test_interpolate_rows_trailing_shape_and_single_sample():
+    values = np.arange(24, dtype=np.float32).reshape(2, 4, 3)
+    out = interpolate_rows([0.0, 2.0], values, [1.0])
+    np.testing.assert_allclose(out[0], values.mean(axis=0))
+    assert out.dtype == np.float32
+    np.testing.assert_array_equal(interpolate_rows([0.0], values[:1], [0.0, 1.0]),
+                                  np.repeat(values[:1], 2, axis=0))
+    with pytest.raises(ValueError):
+        interpolate_rows([], values[:0], [0.0])
+
+
+def _frames(index, values, fps=10.0, times_ms=None):
+    df = pd.DataFrame({"a": values}, index=pd.Index(index, name="frame"))
+    df.attrs["fps"] = fps
+    if times_ms is not None:
+        df.attrs["frame_times_ms"] = np.asarray(times_ms, dtype=np.float64)
+    return df
+
+
+def test_frame_timestamps_prefers_decoder_times():
+    df = _frames([0, 1, 3], [0.0, 1.0, 2.0], times_ms=[0.0, 100.0, 150.0, 400.0])
+    np.testing.assert_allclose(frame_timestamps(df), [0.0, 0.1, 0.4])
+
+
+def test_frame_timestamps_falls_back_to_fps():
+    df = _frames([2, 3, 6], [0.0, 1.0, 2.0], times_ms=[0.0, np.nan])
+    np.testing.assert_allclose(frame_timestamps(df), [0.0, 0.1, 0.4])
+
+
+def test_frame_timestamps_repeat_for_rows_of_one_frame():
+    df = _frames([0, 0, 2, 2], [0.0, 1.0, 2.0, 3.0], times_ms=[10.0, 50.0, 130.0])
+    np.testing.assert_allclose(frame_timestamps(df), [0.0, 0.0, 0.12, 0.12])
+
+
+def test_resample_bridges_gaps_at_their_real_length():
+    df = _frames([0, 4], [0.0, 4.0])  # frames 1-3 had no detection
+    out = resample(df, rate=10.0)
+    np.testing.assert_allclose(out["a"], [0.0, 1.0, 2.0, 3.0, 4.0])
+    assert out.attrs["fps"] == 10.0
+    assert out.index.name == "frame"
+    assert "frame_times_ms" not in out.attrs
+
+
+def test_resample_rejects_multi_object_results():
+    df = _frames([0, 1], [0.0, 1.0])
+    df["object_id"] = [0, 1]
+    with pytest.raises(ValueError):
+        resample(df)
@@ -0,0 +1,32 @@
+import io
+import os
+
+import cv2
+import pytest
+
+from video_source import open_video_source, video_buffer
+
+
+def test_paths_pass_straight_through(make_video):
+    path = make_video()
+    with open_video_source(path) as opened:
+        assert opened == path
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, io.BytesIO])
+def test_in_memory_videos_decode_and_disappear(make_video, wrap):
+    with open(make_video(frames=7), "rb") as f:
+        data = f.read()
+    with open_video_source(wrap(data)) as path:
+        cap = cv2.VideoCapture(path)
+        frames = 0
+        while cap.read()[0]:
+            frames += 1
+        cap.release()
+    assert frames == 7
+    assert not os.path.exists(path)
+
+
+def test_unreadable_sources_are_rejected():
+    with pytest.raises(TypeError):
+        video_buffer(42)
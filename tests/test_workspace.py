@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from workspace import Workspace, WorkspaceQuotaExceeded
+
+
+def test_workspaces_are_private_and_removed_on_exit(tmp_path):
+    with Workspace(root=str(tmp_path)) as first, Workspace(root=str(tmp_path)) as second:
+        assert first.path != second.path
+        path = first.write_bytes("../upload.mp4", b"video")
+        assert os.path.dirname(path) == first.path
+    assert not os.path.exists(first.path)
+    assert not os.path.exists(second.path)
+
+
+def test_writes_past_the_quota_are_refused(tmp_path):
+    with Workspace(quota_bytes=10, root=str(tmp_path)) as workspace:
+        workspace.write_bytes("a", b"12345678")
+        assert workspace.usage() == 8
+        with pytest.raises(WorkspaceQuotaExceeded):
+            workspace.write_bytes("b", b"123")
+        assert not os.path.exists(workspace.file("b"))
+        with open(workspace.file("c"), "wb") as f:
+            f.write(b"123")
+        with pytest.raises(WorkspaceQuotaExceeded):
+            workspace.check_quota()
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+DEFAULT_CONTROL_RATE = 100.0  # Hz, a typical ros_control update rate
+
+
+def interpolate_rows(src_t: np.ndarray, values: np.ndarray, dst_t: np.ndarray) -> np.ndarray:
+    """Linearly interpolates every channel of ``values`` at times ``dst_t``
+
+    ``values`` has time on the first axis and any trailing shape; all
+    channels are interpolated in one broadcast. ``src_t`` must be sorted.
+    Times outside the source range hold the first/last sample.
+    """
+    src_t = np.asarray(src_t, dtype=np.float64)
+    dst_t = np.asarray(dst_t, dtype=np.float64)
+    if len(src_t) == 0:
+        raise ValueError("Cannot interpolate an empty series")
+    if len(src_t) == 1:
+        return np.repeat(values[:1], len(dst_t), axis=0)
+
+    right = np.clip(np.searchsorted(src_t, dst_t, side="right"), 1, len(src_t) - 1)
+    left = right - 1
+    span = src_t[right] - src_t[left]
+    weight = np.clip((dst_t - src_t[left]) / np.where(span > 0, span, 1.0), 0.0, 1.0)
+    weight = weight.reshape((-1,) + (1,) * (values.ndim - 1))
+    return (values[left] + (values[right] - values[left]) * weight).astype(values.dtype, copy=False)
+
+
+def frame_timestamps(joint_data: pd.DataFrame) -> np.ndarray:
+    """Seconds since the first row for every row of a frame-indexed result
+
+    Decoder timestamps (the ``frame_times_ms`` attr) are used when every
+    row has one and they increase; otherwise times come from the frame
+    index and the ``fps`` attr, which is exact for constant-rate video.
+    Rows sharing a frame (multi-object results) share its time.
+    """
+    frames = np.asarray(joint_data.index, dtype=np.int64)
+    if len(frames) == 0:
+        return np.empty(0)
+    times_ms = joint_data.attrs.get("frame_times_ms")
+    if times_ms is not None:
+        times_ms = np.asarray(times_ms, dtype=np.float64)
+        if frames.min() >= 0 and frames.max() < len(times_ms):
+            seconds = times_ms[frames] / 1000.0
+            steps = np.diff(frames)
+            if (np.isfinite(seconds).all() and (steps >= 0).all()
+                    and (np.diff(seconds)[steps > 0] > 0).all()):
+                return seconds - seconds[0]
+    fps = float(joint_data.attrs.get("fps") or 30.0)
+    return (frames - frames[0]) / fps
+
+
+def resample(joint_data: pd.DataFrame, rate: float = DEFAULT_CONTROL_RATE) -> pd.DataFrame:
+    """Every channel linearly interpolated onto a fixed ``rate`` Hz grid
+
+    The grid starts at the first row and covers the clip's duration, so
+    gaps from undetected or skipped frames are bridged at their real
+    length. The result is indexed by sample number with ``fps`` = rate.
+    """
+    if rate <= 0:
+        raise ValueError("rate must be positive")
+    if "object_id" in joint_data.columns:
+        raise ValueError("Resample one object at a time (filter on object_id first)")
+    times = frame_timestamps(joint_data)
+    count = int(np.floor(times[-1] * rate + 1e-9)) + 1 if len(times) else 0
+    grid = np.arange(count) / rate
+    values = joint_data.to_numpy(dtype=np.float64)
+    resampled = interpolate_rows(times, values, grid) if count else values[:0]
+
+    result = pd.DataFrame(resampled, columns=joint_data.columns,
+                          index=pd.RangeIndex(count, name="frame"))
+    result.attrs = {name: value for name, value in joint_data.attrs.items()
+                    if name != "frame_times_ms"}
+    result.attrs["fps"] = float(rate)
+    return result
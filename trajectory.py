@@ -0,0 +1,95 @@
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from servo import joint_angles
+from smoothing import smooth_dataframe
+from timeseries import DEFAULT_CONTROL_RATE, resample
+
+TRAJECTORY_CHUNK_POINTS = 2048
+TRAJECTORY_FORMATS = ("json", "yaml")
+
+
+def _format_rows(values: np.ndarray, float_format: str) -> List[str]:
+    """Comma-separated numbers, one string per row"""
+    text = pd.DataFrame(values).to_csv(header=False, index=False, float_format=float_format,
+                                       lineterminator="\n")
+    return text.splitlines()
+
+
+def iter_joint_trajectory(joint_data: pd.DataFrame,
+                          fmt: str = "json",
+                          rate: float = DEFAULT_CONTROL_RATE,
+                          values: str = "angles",
+                          joints: Optional[List[str]] = None,
+                          velocities: bool = True,
+                          ros_version: int = 2,
+                          frame_id: str = "",
+                          precision: int = 6,
+                          chunk_points: int = TRAJECTORY_CHUNK_POINTS,
+                          smoothing=None, smoothing_options=None) -> Iterator[bytes]:
+    """Yields a trajectory_msgs/JointTrajectory as JSON or YAML bytes
+
+    ``values="angles"`` exports joint flexion angles in radians (see
+    ``servo.joint_angles``); ``"coordinates"`` exports the landmark
+    channels as they are. Both are resampled to ``rate`` Hz first, with
+    velocities from central differences. Points are formatted and yielded
+    ``chunk_points`` at a time, so only one block of text is alive however
+    long the trajectory is. ``ros_version=1`` writes ``secs``/``nsecs``
+    durations instead of ROS 2's ``sec``/``nanosec``.
+    """
+    if fmt not in TRAJECTORY_FORMATS:
+        raise ValueError(f"Unknown trajectory format {fmt!r}; choose from {', '.join(TRAJECTORY_FORMATS)}")
+    joint_data = smooth_dataframe(joint_data, smoothing, **(smoothing_options or {}))
+    if values == "angles":
+        angles = joint_angles(joint_data, joints)
+        channels = pd.DataFrame(np.radians(angles.to_numpy(dtype=np.float64)),
+                                columns=[c[:-len("_ANGLE")] for c in angles.columns],
+                                index=angles.index)
+        channels.attrs = angles.attrs
+    elif values == "coordinates":
+        channels = joint_data
+    else:
+        raise ValueError("values must be 'angles' or 'coordinates'")
+    if channels.empty:
+        raise ValueError("No frames to export")
+
+    resampled = resample(channels, rate)
+    positions = resampled.to_numpy(dtype=np.float64)
+    if velocities:
+        speeds = (np.gradient(positions, 1.0 / rate, axis=0) if len(positions) > 1
+                  else np.zeros_like(positions))
+    nanoseconds = np.rint(np.arange(len(positions)) * (1e9 / rate)).astype(np.int64)
+    sec_key, nsec_key = ("secs", "nsecs") if ros_version == 1 else ("sec", "nanosec")
+    names = [str(c) for c in resampled.columns]
+    float_format = f"%.{precision}f"
+
+    if fmt == "json":
+        quoted = ", ".join('"' + name.replace('"', '\\"') + '"' for name in names)
+        yield (f'{{"header": {{"stamp": {{"{sec_key}": 0, "{nsec_key}": 0}}, '
+               f'"frame_id": "{frame_id}"}},\n"joint_names": [{quoted}],\n"points": [\n').encode("utf-8")
+
+        def point(p, v, s, n):
+            velocity = f', "velocities": [{v}]' if velocities else ""
+            return (f'{{"positions": [{p}]{velocity}, '
+                    f'"time_from_start": {{"{sec_key}": {s}, "{nsec_key}": {n}}}}}')
+        separator, closing = ",\n", "\n]}\n"
+    else:
+        yield (f"header:\n  stamp: {{{sec_key}: 0, {nsec_key}: 0}}\n  frame_id: '{frame_id}'\n"
+               f"joint_names: [{', '.join(names)}]\npoints:\n").encode("utf-8")
+
+        def point(p, v, s, n):
+            velocity = f"\n  velocities: [{v}]" if velocities else ""
+            return f"- positions: [{p}]{velocity}\n  time_from_start: {{{sec_key}: {s}, {nsec_key}: {n}}}"
+        separator, closing = "\n", "\n"
+
+    for start in range(0, len(positions), chunk_points):
+        stop = start + chunk_points
+        rows = _format_rows(positions[start:stop], float_format)
+        rates = _format_rows(speeds[start:stop], float_format) if velocities else [""] * len(rows)
+        secs, nsecs = np.divmod(nanoseconds[start:stop], 1_000_000_000)
+        block = separator.join(point(p, v, s, n)
+                               for p, v, s, n in zip(rows, rates, secs.tolist(), nsecs.tolist()))
+        yield ((separator if start else "") + block).encode("utf-8")
+    yield closing.encode("utf-8")
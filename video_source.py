@@ -0,0 +1,54 @@
+import os
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+from workspace import Workspace
+
+VideoSource = Union[str, os.PathLike, bytes, bytearray, memoryview]
+
+
+def is_path(source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def video_buffer(source) -> Union[bytes, memoryview]:
+    """Bytes view of an in-memory video (bytes, BytesIO, Streamlit uploads)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source)
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    if hasattr(source, "read"):
+        return source.read()
+    raise TypeError(f"Can't read video data from {type(source).__name__}")
+
+
+@contextmanager
+def open_video_source(source: VideoSource) -> Iterator[str]:
+    """Yields a path OpenCV can decode, backed by memory for in-memory sources
+
+    Paths pass straight through. Buffers go into an anonymous memfd,
+    opened through ``/proc/<pid>/fd`` so spawned worker processes can read
+    the same file; it's seekable, so every container format works. Where
+    memfd isn't available the bytes go to a tmpfs ``Workspace`` instead.
+    Either way the upload never lands on persistent storage and is gone
+    when the block exits.
+    """
+    if is_path(source):
+        yield os.fspath(source)
+        return
+
+    data = video_buffer(source)
+    proc_fd = f"/proc/{os.getpid()}/fd"
+    if hasattr(os, "memfd_create") and os.path.isdir(proc_fd):
+        fd = os.memfd_create("motion2code_upload")
+        try:
+            with memoryview(data).cast("B") as view:
+                written = 0
+                while written < len(view):
+                    written += os.write(fd, view[written:])
+            yield f"{proc_fd}/{fd}"
+        finally:
+            os.close(fd)
+    else:
+        with Workspace() as workspace:
+            yield workspace.write_bytes("upload.mp4", data)
@@ -0,0 +1,93 @@
+import atexit
+import os
+import shutil
+import tempfile
+import threading
+from typing import Optional
+
+# RAM-backed when available, so scratch files never hit the disk
+SHM_ROOT = "/dev/shm"
+DEFAULT_QUOTA_BYTES = int(os.environ.get("MOTION2CODE_WORKSPACE_QUOTA_MB", "1024")) * 1024 * 1024
+
+_live = set()
+_live_lock = threading.Lock()
+
+
+class WorkspaceQuotaExceeded(OSError):
+    """Raised when a write would push a workspace past its quota"""
+
+
+def _default_root(quota_bytes: int) -> Optional[str]:
+    """/dev/shm if it's writable and has room for a full quota, else the temp dir"""
+    try:
+        if os.access(SHM_ROOT, os.W_OK) and shutil.disk_usage(SHM_ROOT).free > quota_bytes:
+            return SHM_ROOT
+    except OSError:
+        pass
+    return None
+
+
+class Workspace:
+    """Private scratch directory for one request, removed on exit
+
+    Each request gets its own directory (on tmpfs when possible), so
+    concurrent conversions never share file names. Writes through
+    ``write_bytes`` are checked against ``quota_bytes``; anything else
+    written into the directory is counted by ``check_quota``.
+    """
+
+    def __init__(self, quota_bytes: int = DEFAULT_QUOTA_BYTES, root: Optional[str] = None):
+        self.quota_bytes = quota_bytes
+        self.path = tempfile.mkdtemp(prefix="motion2code_", dir=root or _default_root(quota_bytes))
+        with _live_lock:
+            _live.add(self.path)
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cleanup()
+
+    def file(self, name: str) -> str:
+        """Path for a file inside the workspace"""
+        return os.path.join(self.path, os.path.basename(name))
+
+    def usage(self) -> int:
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def check_quota(self, extra_bytes: int = 0) -> None:
+        used = self.usage()
+        if used + extra_bytes > self.quota_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Workspace quota of {self.quota_bytes // 2 ** 20} MB exceeded "
+                f"({(used + extra_bytes) // 2 ** 20} MB needed)")
+
+    def write_bytes(self, name: str, data) -> str:
+        """Writes ``data`` to the workspace after checking the quota"""
+        self.check_quota(len(data))
+        path = self.file(name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        with _live_lock:
+            _live.discard(self.path)
+
+
+@atexit.register
+def _cleanup_live_workspaces() -> None:
+    """Last-resort cleanup for workspaces whose owner never exited cleanly"""
+    with _live_lock:
+        paths = list(_live)
+        _live.clear()
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)